@@ -1,26 +1,17 @@
 # main.py
-from lexer import Lexer
+import sys
+
+from lexer import Lexer, StreamLexer
 from parser import Parser
 from ast_printer import print_ast
 
-def test_lexer(input_text):
-    lexer = Lexer(input_text)
-    tokens = []
-    while True:
-        token = lexer.get_next_token()
-        tokens.append(token)
-        if token.type == "EOF":
-            break
-    return tokens
-
-if __name__ == "__main__":
-    user_input = input("Enter a mathematical expression: ")
-    tokens = test_lexer(user_input)
-
-    print("\nTokenized Output:")
-    for token in tokens:
-        print(token)
+def test_lexer(input_text, compact=False):
+    # compact=True: a TokenBuffer (parallel arrays) instead of a list of Tokens
+    if compact:
+        return Lexer(input_text).tokenize_compact()
+    return list(Lexer(input_text).tokenize())
 
+def parse_and_print(tokens):
     parser = Parser(tokens)
     try:
         ast = parser.parse()
@@ -28,3 +19,19 @@ if __name__ == "__main__":
         print_ast(ast)
     except Exception as e:
         print(f"Parser error: {e}")
+
+if __name__ == "__main__":
+    if "--stream" in sys.argv[1:]:
+        # One expression per line from stdin, lexed and parsed as the feed arrives
+        for tokens in StreamLexer(sys.stdin.buffer).expressions():
+            parse_and_print(tokens)
+        sys.exit()
+
+    user_input = input("Enter a mathematical expression: ")
+    tokens = test_lexer(user_input, compact=True)
+
+    print("\nTokenized Output:")
+    for token in tokens:
+        print(token)
+
+    parse_and_print(tokens)
@@ -1,53 +1,69 @@
 # parser.py
 from ast_nodes import *
-from tokens import TokenType
+from tokens import TokenType, TokenBuffer
 
 class Parser:
     def __init__(self, tokens):
+        # tokens: a list of Tokens or a TokenBuffer. With a buffer, types and
+        # values are read straight from its arrays; a Token is only created
+        # for operators and functions kept in the AST.
         self.tokens = tokens
         self.pos = 0
+        if isinstance(tokens, TokenBuffer):
+            self._type_at = tokens.type_at
+            self._value_at = tokens.value_at
+        else:
+            self._type_at = lambda i: tokens[i].type
+            self._value_at = lambda i: tokens[i].value
 
     def current_token(self):
         return self.tokens[self.pos] if self.pos < len(self.tokens) else None
 
+    def current_type(self):
+        return self._type_at(self.pos) if self.pos < len(self.tokens) else None
+
     def eat(self, token_type):
-        if self.current_token().type == token_type:
+        current = self.current_type()
+        if current == token_type:
             self.pos += 1
         else:
-            raise Exception(f"Expected {token_type}, got {self.current_token().type}")
+            raise Exception(f"Expected {token_type}, got {TokenType(current) if current is not None else None}")
 
     def parse(self):
         return self.expression()
 
     def factor(self):
-        token = self.current_token()
+        token_type = self.current_type()
 
-        if token.type == TokenType.PLUS or token.type == TokenType.MINUS:
-            self.eat(token.type)
+        if token_type == TokenType.PLUS or token_type == TokenType.MINUS:
+            token = self.current_token()
+            self.eat(token_type)
             return UnaryOpNode(token, self.factor())
 
-        if token.type == TokenType.INTEGER or token.type == TokenType.FLOAT:
-            self.eat(token.type)
-            return NumberNode(token.value)
+        if token_type == TokenType.INTEGER or token_type == TokenType.FLOAT:
+            value = self._value_at(self.pos)
+            self.eat(token_type)
+            return NumberNode(value)
 
-        if token.type in (TokenType.SIN, TokenType.COS, TokenType.TAN, TokenType.LOG, TokenType.SQRT, TokenType.EXP, TokenType.ABS, TokenType.POW):
-            self.eat(token.type)
+        if token_type in (TokenType.SIN, TokenType.COS, TokenType.TAN, TokenType.LOG, TokenType.SQRT, TokenType.EXP, TokenType.ABS, TokenType.POW):
+            token = self.current_token()
+            self.eat(token_type)
             self.eat(TokenType.LPAREN)
             node = self.expression()
             self.eat(TokenType.RPAREN)
             return FunctionNode(token, node)
 
-        if token.type == TokenType.LPAREN:
+        if token_type == TokenType.LPAREN:
             self.eat(TokenType.LPAREN)
             node = self.expression()
             self.eat(TokenType.RPAREN)
             return node
 
-        raise Exception(f"Unexpected token: {token}")
+        raise Exception(f"Unexpected token: {self.current_token()}")
 
     def term(self):
         node = self.factor()
-        while self.current_token() and self.current_token().type in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
+        while self.current_type() in (TokenType.MULTIPLY, TokenType.DIVIDE, TokenType.MODULO):
             token = self.current_token()
             self.eat(token.type)
             node = BinaryOpNode(node, token, self.factor())
@@ -55,7 +71,7 @@ class Parser:
 
     def expression(self):
         node = self.term()
-        while self.current_token() and self.current_token().type in (TokenType.PLUS, TokenType.MINUS):
+        while self.current_type() in (TokenType.PLUS, TokenType.MINUS):
             token = self.current_token()
             self.eat(token.type)
             node = BinaryOpNode(node, token, self.term())
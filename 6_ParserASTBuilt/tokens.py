@@ -1,32 +1,18 @@
-class TokenType:
-    INTEGER = "INTEGER"
-    FLOAT = "FLOAT"
-    PLUS = "PLUS"
-    MINUS = "MINUS"
-    MULTIPLY = "MULTIPLY"
-    DIVIDE = "DIVIDE"
-    MODULO = "MODULO"
-    EXPONENT = "EXPONENT"
-    FACTORIAL = "FACTORIAL"
-    LPAREN = "LPAREN"
-    RPAREN = "RPAREN"
-    SIN = "SIN"
-    COS = "COS"
-    TAN = "TAN"
-    LOG = "LOG"
-    SQRT = "SQRT"
-    EXP = "EXP"
-    ABS = "ABS"
-    POW = "POW"
-    PI = "PI"
-    E = "E"
-    EOF = "EOF"
-    INVALID = "INVALID"
+# tokens.py
+import importlib.util
+from pathlib import Path
 
-class Token:
-    def __init__(self, type_, value=None):
-        self.type = type_
-        self.value = value
+# Token types and buffers are defined once, in lab3/tokens.py, and loaded
+# here under their own module name, so the parser and the shared lexer
+# engine (see lexer.py) use the same classes.
+_spec = importlib.util.spec_from_file_location(
+    "lab3_tokens", Path(__file__).resolve().parent.parent / "lab3" / "tokens.py"
+)
+_tokens = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_tokens)
 
-    def __repr__(self):
-        return f"Token({self.type}, {repr(self.value)})"
\ No newline at end of file
+TokenType = _tokens.TokenType
+FUNCTION_TYPES = _tokens.FUNCTION_TYPES
+CONSTANT_VALUES = _tokens.CONSTANT_VALUES
+Token = _tokens.Token
+TokenBuffer = _tokens.TokenBuffer
@@ -0,0 +1,181 @@
+import json
+from collections import deque
+
+
+def symbol_class(symbols):
+    """
+    Compact label for a set of symbols: runs of consecutive characters are
+    written as ranges, e.g. {"a", "b", "c", "x"} -> "a-c,x".
+    """
+    if len(symbols) == 1:
+        return symbols[0]
+    symbols = sorted(symbols, key=lambda symbol: (len(symbol) != 1, symbol))
+    parts = []
+    i = 0
+    while i < len(symbols):
+        j = i
+        if len(symbols[i]) == 1:
+            while (j + 1 < len(symbols) and len(symbols[j + 1]) == 1
+                   and ord(symbols[j + 1]) == ord(symbols[j]) + 1):
+                j += 1
+        if j - i >= 2:
+            parts.append(f"{symbols[i]}-{symbols[j]}")
+        else:
+            parts.extend(symbols[i:j + 1])
+        i = j + 1
+    return ",".join(parts)
+
+
+def select_states(edges, roots, max_states=None, radius=None, undirected=False):
+    """
+    States found by BFS from roots, at most radius steps away (None: no
+    limit) and at most max_states of them, in BFS order.
+    """
+    neighbours = {}  # state -> dict used as an ordered set, for a stable output
+    for state, _symbol, target in edges:
+        neighbours.setdefault(state, {})[target] = None
+        if undirected:
+            neighbours.setdefault(target, {})[state] = None
+
+    selected = {}
+    queue = deque()
+    for root in roots:
+        if root not in selected:
+            selected[root] = 0
+            queue.append(root)
+    while queue:
+        state = queue.popleft()
+        distance = selected[state]
+        if radius is not None and distance >= radius:
+            continue
+        for target in neighbours.get(state, ()):
+            if target not in selected:
+                if max_states is not None and len(selected) >= max_states:
+                    return list(selected)
+                selected[target] = distance + 1
+                queue.append(target)
+    return list(selected)
+
+
+def group_edges(edges, keep=None):
+    """(state, target) -> list of symbols, merging parallel edges."""
+    grouped = {}
+    for state, symbol, target in edges:
+        if keep is None or (state in keep and target in keep):
+            grouped.setdefault((state, target), []).append(symbol)
+    return grouped
+
+
+def stream_grouped_edges(edges):
+    """
+    Yields ((state, target), symbols) like group_edges().items() without
+    holding every edge: parallel edges are merged within each run of edges
+    leaving the same state, and FiniteAutomaton yields a state's edges together.
+    """
+    current = None
+    targets = {}
+    for state, symbol, target in edges:
+        if state != current:
+            for previous_target, symbols in targets.items():
+                yield (current, previous_target), symbols
+            current = state
+            targets = {}
+        targets.setdefault(target, []).append(symbol)
+    for target, symbols in targets.items():
+        yield (current, target), symbols
+
+
+def _quote(name):
+    return '"' + str(name).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class _Memo(dict):
+    # name -> its encoding, computed once per name (states recur on many edges)
+    def __init__(self, encode):
+        super().__init__()
+        self.encode = encode
+
+    def __missing__(self, name):
+        value = self[name] = self.encode(name)
+        return value
+
+
+def write_dot(out, states, start_state, final_states, grouped, name="finite_automaton"):
+    """
+    Streams a DOT digraph to the text file out, one line per node/edge;
+    grouped yields ((state, target), symbols) pairs.
+    """
+    write = out.write
+    quoted = _Memo(_quote)
+    labels = _Memo(lambda symbols: _quote(symbol_class(list(symbols))))
+    write(f"digraph {name} {{\n  rankdir=LR;\n  node [shape=circle];\n")
+    write('  "__start__" [shape=none, label=""];\n')
+    for state in states:
+        if state in final_states:
+            write(f"  {quoted[state]} [shape=doublecircle];\n")  # Final states: double circle
+        elif state == start_state:
+            write(f"  {quoted[state]} [style=bold];\n")  # Start state: bold circle
+        else:
+            write(f"  {quoted[state]};\n")
+    if start_state in states:
+        write(f'  "__start__" -> {quoted[start_state]};\n')
+    for (state, target), symbols in grouped:
+        write(f"  {quoted[state]} -> {quoted[target]} [label={labels[tuple(symbols)]}];\n")
+    write("}\n")
+
+
+def write_json(out, states, start_state, final_states, grouped):
+    """Streams the automaton as JSON: states, start, final states and merged edges."""
+    write = out.write
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    names = _Memo(lambda state: encode(str(state)))
+    labels = _Memo(lambda symbols: f'"symbols": {encode(sorted(symbols))}, '
+                                   f'"label": {encode(symbol_class(list(symbols)))}')
+    written = set(states)
+    write('{"start": ' + encode(str(start_state)))
+    write(', "final": ' + encode(sorted(str(state) for state in final_states if state in written)))
+    write(', "states": [')
+    for i, state in enumerate(states):
+        write((", " if i else "") + names[state])
+    write('], "edges": [')
+    separator = "\n  "
+    for (state, target), symbols in grouped:
+        write(f'{separator}{{"from": {names[state]}, "to": {names[target]}, {labels[tuple(symbols)]}}}')
+        separator = ",\n  "
+    write("\n]}\n")
+
+
+def export_automaton(out, fmt, states, edges, start_state, final_states,
+                     max_states=None, around=None, radius=2):
+    """
+    Writes the automaton as "dot" or "json" to a path or text file object.
+    With around (a state or list of states) only their neighbourhood of the
+    given radius is written; max_states caps the number of states written.
+    Without either, the edges (all edges of a state together) are streamed.
+    """
+    if fmt not in ("dot", "json"):
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    if around is None and max_states is None:
+        # Everything is written: edges are merged and written as they come
+        selected = states
+        grouped = stream_grouped_edges(edges)
+    else:
+        edges = list(edges)  # Read twice: for the selection, then for writing
+        if around is not None:
+            roots = list(around) if isinstance(around, (list, tuple, set, frozenset)) else [around]
+            selected = select_states(edges, roots, max_states=max_states, radius=radius, undirected=True)
+        else:
+            selected = select_states(edges, [start_state], max_states=max_states)
+        grouped = group_edges(edges, set(selected)).items()
+
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8") as file:
+            return _write(file, fmt, selected, start_state, final_states, grouped)
+    return _write(out, fmt, selected, start_state, final_states, grouped)
+
+
+def _write(out, fmt, selected, start_state, final_states, grouped):
+    if fmt == "dot":
+        write_dot(out, selected, start_state, final_states, grouped)
+    else:
+        write_json(out, selected, start_state, final_states, grouped)
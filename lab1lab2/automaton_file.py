@@ -0,0 +1,79 @@
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from lab1lab2.compiled_automaton import CompiledDFA
+
+# File layout (little-endian):
+#   header    magic, version, flags, n_states, n_symbols, start, symbols size, CRC-32
+#   symbols   JSON list of the column symbols (UTF-8), zero-padded to 4 bytes
+#   table     n_states * n_symbols int32 transitions (-1 = dead)
+#   accepting n_states bytes (1 = final state)
+# The CRC-32 covers everything after the header.
+MAGIC = b"LFADFA\r\n"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHIIiII")
+
+
+def save_compiled(compiled, path):
+    """Writes a CompiledDFA to path in the versioned binary format."""
+    symbols = json.dumps(compiled.symbols, ensure_ascii=False).encode("utf-8")
+    symbols += b"\0" * (-len(symbols) % 4)  # Keep the int32 table aligned
+
+    table = array("i", compiled.table)
+    if sys.byteorder != "little":
+        table.byteswap()
+    payload = symbols + table.tobytes() + bytes(compiled.accepting)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, compiled.n_states, compiled.stride, compiled.start,
+        len(symbols), zlib.crc32(payload)
+    )
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(payload)
+
+
+def load_compiled(path, use_mmap=True):
+    """
+    Reads a CompiledDFA written by save_compiled. With use_mmap the table and
+    the accepting flags are views into a read-only mapping of the file, so
+    processes loading the same file share its pages instead of copying them.
+    Raises ValueError on a wrong magic, version, size or checksum.
+    """
+    with open(path, "rb") as file:
+        if use_mmap:
+            data = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            data = memoryview(file.read())
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: file too short for an automaton header")
+    magic, version, _flags, n_states, n_symbols, start, symbols_size, checksum = HEADER.unpack(
+        data[:HEADER.size]
+    )
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a compiled automaton file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported format version {version} (expected {FORMAT_VERSION})")
+
+    table_start = HEADER.size + symbols_size
+    accepting_start = table_start + 4 * n_states * n_symbols
+    if len(data) != accepting_start + n_states:
+        raise ValueError(f"{path}: size does not match the header")
+    if zlib.crc32(data[HEADER.size:]) != checksum:
+        raise ValueError(f"{path}: checksum mismatch, the file is corrupted")
+
+    symbols = json.loads(bytes(data[HEADER.size:table_start]).rstrip(b"\0").decode("utf-8"))
+    if sys.byteorder == "little":
+        table = data[table_start:accepting_start].cast("i")  # Zero-copy view
+    else:
+        table = array("i")
+        table.frombytes(data[table_start:accepting_start])
+        table.byteswap()
+    accepting = data[accepting_start:]
+
+    return CompiledDFA(symbols, table, accepting, start=start)
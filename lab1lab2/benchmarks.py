@@ -0,0 +1,234 @@
+"""
+Benchmarks for FiniteAutomaton construction and matching.
+
+Run from the repository root:
+    python -m lab1lab2.benchmarks --output bench.json
+    python -m lab1lab2.benchmarks --quick --baseline bench.json
+
+Every case is built by a seeded generator, so runs are comparable; results
+are written as JSON and, with --baseline, compared case by case.
+"""
+import argparse
+import json
+import platform
+import random
+import string
+import time
+
+from lab1lab2.finite_automaton import FiniteAutomaton
+
+
+def random_nfa(n_states, n_symbols, density, seed, epsilon_density=0.0):
+    """
+    Random NFA: every (state, symbol) pair gets each target with probability
+    density / n_states * 2 (about 2 * density targets on average).
+    """
+    rng = random.Random(seed)
+    states = [f"q{i}" for i in range(n_states)]
+    alphabet = list(string.ascii_lowercase[:n_symbols])
+    p = min(1.0, 2 * density / n_states)
+    transitions = {}
+    for state in states:
+        for symbol in alphabet + (["ε"] if epsilon_density else []):
+            chance = epsilon_density / n_states if symbol == "ε" else p
+            targets = {target for target in states if rng.random() < chance}
+            if targets:
+                transitions.setdefault(state, {})[symbol] = targets
+    final_states = {state for state in states if rng.random() < 0.2} or {states[-1]}
+    return FiniteAutomaton(set(states), set(alphabet), transitions, states[0], final_states)
+
+
+def random_dfa(n_states, n_symbols, density, seed):
+    """Random DFA: each (state, symbol) has a transition with probability density."""
+    rng = random.Random(seed)
+    states = [f"q{i}" for i in range(n_states)]
+    alphabet = list(string.ascii_lowercase[:n_symbols])
+    transitions = {
+        state: {symbol: rng.choice(states) for symbol in alphabet if rng.random() < density}
+        for state in states
+    }
+    final_states = {state for state in states if rng.random() < 0.3} or {states[-1]}
+    return FiniteAutomaton(set(states), set(alphabet), transitions, states[0], final_states)
+
+
+def nth_from_end_nfa(n):
+    """
+    NFA for "the n-th symbol from the end is a" over {a, b}: n + 1 states,
+    but its minimal DFA needs 2**n states (worst case of subset construction).
+    """
+    states = [f"q{i}" for i in range(n + 1)]
+    transitions = {"q0": {"a": {"q0", "q1"}, "b": {"q0"}}}
+    for i in range(1, n):
+        transitions[f"q{i}"] = {"a": {f"q{i + 1}"}, "b": {f"q{i + 1}"}}
+    return FiniteAutomaton(set(states), {"a", "b"}, transitions, "q0", {f"q{n}"})
+
+
+def random_strings(alphabet, count, length, seed):
+    rng = random.Random(seed)
+    symbols = sorted(alphabet)
+    return ["".join(rng.choice(symbols) for _ in range(length)) for _ in range(count)]
+
+
+def best_time(function, repeat, setup=None):
+    """
+    Fastest of repeat runs, in seconds, and the last result. With setup, each
+    run calls function(setup()) and only function is timed, so no run can
+    reuse what an earlier one cached.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = function() if setup is None else function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_construction(name, params, build, repeat, max_states):
+    # build() makes a fresh copy of the FA, so conversions start without caches
+    fa = build()
+    results = []
+
+    seconds, _ = best_time(fa.is_deterministic, repeat)
+    results.append({"case": name, "op": "is_deterministic", **params, "seconds": seconds})
+
+    seconds, _ = best_time(fa.to_regular_grammar, repeat)
+    results.append({"case": name, "op": "to_regular_grammar", **params, "seconds": seconds})
+
+    try:
+        seconds, dfa = best_time(lambda fa: fa.convert_ndfa_to_dfa(max_states=max_states), repeat, build)
+        results.append({
+            "case": name, "op": "convert_ndfa_to_dfa", **params,
+            "seconds": seconds, "dfa_states": len(dfa.Q),
+        })
+    except ValueError:
+        results.append({
+            "case": name, "op": "convert_ndfa_to_dfa", **params,
+            "seconds": None, "capped": max_states,
+        })
+    return results
+
+
+def bench_membership(name, params, fa, strings, repeat, engine="auto"):
+    chars = sum(len(s) for s in strings)
+    fa.stringBelongToLanguage("", engine=engine)  # Build cached tables outside the timing
+    seconds, accepted = best_time(
+        lambda: sum(fa.stringBelongToLanguage(s, engine=engine) for s in strings), repeat
+    )
+    return {
+        "case": name, "op": f"membership[{engine}]", **params,
+        "seconds": seconds,
+        "strings_per_sec": len(strings) / seconds if seconds else None,
+        "chars_per_sec": chars / seconds if seconds else None,
+        "accepted": accepted,
+    }
+
+
+def bench_match_many(name, params, fa, strings, repeat):
+    chars = sum(len(s) for s in strings)
+    fa.match_many(strings[:1])  # Determinize and compile outside the timing
+    seconds, accepted = best_time(lambda: int(sum(fa.match_many(strings))), repeat)
+    return {
+        "case": name, "op": "match_many", **params,
+        "seconds": seconds,
+        "strings_per_sec": len(strings) / seconds if seconds else None,
+        "chars_per_sec": chars / seconds if seconds else None,
+        "accepted": accepted,
+    }
+
+
+def run(quick=False, seed=0, repeat=3):
+    state_counts = [10, 50] if quick else [10, 100, 300]
+    alphabet_sizes = [2] if quick else [2, 5]
+    densities = [0.5, 2.0]
+    nth_sizes = [6, 10] if quick else [8, 12, 16]
+    n_strings, length = (200, 50) if quick else (2000, 100)
+    max_states = 20000
+
+    results = []
+    for n_states in state_counts:
+        for n_symbols in alphabet_sizes:
+            for density in densities:
+                params = {"states": n_states, "symbols": n_symbols, "density": density}
+                case_seed = f"{seed}-{n_states}-{n_symbols}-{density}"
+
+                def build_nfa():
+                    return random_nfa(n_states, n_symbols, density, case_seed, epsilon_density=0.1)
+
+                def build_dfa():
+                    return random_dfa(n_states, n_symbols, min(1.0, density / 2 + 0.5), case_seed)
+
+                construction = bench_construction("random_nfa", params, build_nfa, repeat, max_states)
+                results.extend(construction)
+                nfa = build_nfa()
+                strings = random_strings(nfa.Sigma, n_strings, length, case_seed)
+                for engine in ("sets", "bitset", "lazy"):
+                    results.append(bench_membership("random_nfa", params, nfa, strings, repeat, engine))
+                if "capped" not in construction[-1]:  # match_many determinizes without a cap
+                    results.append(bench_match_many("random_nfa", params, nfa, strings, repeat))
+
+                results.extend(bench_construction("random_dfa", params, build_dfa, repeat, max_states))
+                dfa = build_dfa()
+                results.append(bench_membership("random_dfa", params, dfa, strings, repeat))
+                results.append(bench_match_many("random_dfa", params, dfa, strings, repeat))
+
+    for n in nth_sizes:
+        params = {"n": n}
+        results.extend(bench_construction("nth_from_end", params, lambda: nth_from_end_nfa(n), repeat, max_states))
+        nfa = nth_from_end_nfa(n)
+        strings = random_strings(nfa.Sigma, n_strings, length, f"{seed}-nth-{n}")
+        results.append(bench_membership("nth_from_end", params, nfa, strings, repeat, "bitset"))
+        results.append(bench_match_many("nth_from_end", params, nfa, strings, repeat))
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "quick": quick,
+        "results": results,
+    }
+
+
+MEASUREMENTS = {"seconds", "strings_per_sec", "chars_per_sec", "dfa_states", "accepted", "capped"}
+
+
+def case_key(result):
+    return tuple(sorted((k, v) for k, v in result.items() if k not in MEASUREMENTS))
+
+
+def compare(report, baseline):
+    """Prints the time ratio of every case against the same case in baseline."""
+    previous = {case_key(result): result for result in baseline["results"]}
+    for result in report["results"]:
+        old = previous.get(case_key(result))
+        if not old or not old.get("seconds") or not result.get("seconds"):
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        label = " ".join(f"{k}={v}" for k, v in case_key(result))
+        flag = "  SLOWER" if ratio > 1.1 else ""
+        print(f"{ratio:6.2f}x  {label}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FiniteAutomaton benchmarks")
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--quick", action="store_true", help="small grid for a fast check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = run(quick=args.quick, seed=args.seed, repeat=args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
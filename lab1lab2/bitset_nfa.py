@@ -0,0 +1,136 @@
+EPSILON = "ε"
+
+
+class BitsetNFA:
+    """
+    NFA with states numbered 0..n-1 and sets of states stored as int bitmasks.
+
+    successors[symbol][i] is the ε-closed mask of states reachable from state i
+    on symbol, so stepping a whole state set is a union of precomputed masks.
+    For bit-parallel matching the masks are also grouped in blocks of
+    block_width states, each with a table of the union for every subset of
+    the block, so a step costs one OR per block instead of one per state.
+    """
+
+    dead = 0  # The empty set of states
+
+    def __init__(self, start_state, final_states, edges, block_width=8):
+        self.names = []    # state number -> state name
+        self.index = {}    # state name -> state number
+        self._number(start_state)
+
+        moves = {}         # symbol -> {state number: [target numbers]}
+        for state, symbol, target in edges:
+            source = self._number(state)
+            moves.setdefault(symbol, {}).setdefault(source, []).append(self._number(target))
+        for state in final_states:
+            self._number(state)
+
+        # ε-closure of every single state
+        epsilon = moves.pop(EPSILON, {})
+        self.closure = []
+        for state in range(len(self.names)):
+            mask = 1 << state
+            stack = [state]
+            while stack:
+                for target in epsilon.get(stack.pop(), ()):
+                    if not mask >> target & 1:
+                        mask |= 1 << target
+                        stack.append(target)
+            self.closure.append(mask)
+
+        # Per-symbol successor masks, already ε-closed
+        self.successors = {}
+        for symbol, table in moves.items():
+            row = [0] * len(self.names)
+            for source, targets in table.items():
+                for target in targets:
+                    row[source] |= self.closure[target]
+            self.successors[symbol] = row
+
+        self.block_width = block_width
+        self.blocks = {symbol: {} for symbol in self.successors}  # symbol -> {block: table}
+
+        self.start = self.closure[0]
+        self.final_mask = 0
+        for state in final_states:
+            self.final_mask |= 1 << self.index[state]
+
+    def _number(self, state):
+        number = self.index.get(state)
+        if number is None:
+            number = self.index[state] = len(self.names)
+            self.names.append(state)
+        return number
+
+    @property
+    def n_states(self):
+        return len(self.names)
+
+    def step(self, mask, symbol):
+        """Set of states reached from mask on symbol (0 if none)."""
+        row = self.successors.get(symbol)
+        if row is None:
+            return 0
+        result = 0
+        while mask:
+            low = mask & -mask
+            result |= row[low.bit_length() - 1]
+            mask ^= low
+        return result
+
+    def _block_table(self, symbol, block):
+        # Union of successor masks for every subset of the states in one block,
+        # built on first use: table[bits] = table[bits without lowest] | row[lowest]
+        row = self.successors[symbol]
+        first = block * self.block_width
+        width = min(self.block_width, len(row) - first)
+        table = [0] * (1 << width)
+        for bits in range(1, 1 << width):
+            low = bits & -bits
+            table[bits] = table[bits ^ low] | row[first + low.bit_length() - 1]
+        self.blocks[symbol][block] = table
+        return table
+
+    def step_blocks(self, mask, symbol):
+        """Same result as step(), using one table lookup per block of states."""
+        tables = self.blocks.get(symbol)
+        if tables is None:
+            return 0
+        width = self.block_width
+        low_bits = (1 << width) - 1
+        result = 0
+        block = 0
+        while mask:
+            bits = mask & low_bits
+            if bits:
+                table = tables.get(block)
+                if table is None:
+                    table = self._block_table(symbol, block)
+                result |= table[bits]
+            mask >>= width
+            block += 1
+        return result
+
+    def match(self, input_string, alphabet):
+        """Bit-parallel simulation of the NFA over input_string."""
+        mask = self.start
+        for char in input_string:
+            if char not in alphabet:
+                return False
+            mask = self.step_blocks(mask, char)
+            if not mask:
+                return False
+        return bool(mask & self.final_mask)
+
+    def is_accepting(self, mask):
+        return bool(mask & self.final_mask)
+
+    def states_of(self, mask):
+        """Original state names contained in mask."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return frozenset(names)
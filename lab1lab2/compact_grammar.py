@@ -0,0 +1,126 @@
+from array import array
+
+from lab1lab2.derivation import EPSILON, split_production, symbol_lengths
+
+
+class SymbolTable:
+    """Interns grammar symbol names as small ints, in order of first use."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol):
+        return self.names[symbol]
+
+    def get(self, name, default=None):
+        return self.ids.get(name, default)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def __len__(self):
+        return len(self.names)
+
+
+class CompactGrammar:
+    """
+    Productions as flat int arrays over a SymbolTable: rule i has head
+    heads[i] and body bodies[offsets[i]:offsets[i + 1]]. An empty body is an
+    ε-production. Rules keep their insertion order, and items() groups them
+    by head in order of first appearance, like a production dict.
+    """
+
+    def __init__(self, symbols=None):
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.heads = array("i")
+        self.offsets = array("i", [0])
+        self.bodies = array("i")
+
+    @classmethod
+    def from_productions(cls, productions, symbols=()):
+        """
+        Reads a production dict in the ExtendedGrammar form ({"S": ["aA", "ε"]})
+        or the CFGtoCNFConverter form ({"S": [["d", "B"], ["ε"]]}); string
+        bodies are split as in split_production.
+        """
+        grammar = cls()
+        known = set(productions) | set(symbols)
+        lengths = symbol_lengths(known)
+        intern = grammar.symbols.intern
+        for head in productions:
+            intern(head)
+        for head, bodies in productions.items():
+            head_id = intern(head)
+            for body in bodies:
+                grammar.add(head_id, [intern(symbol) for symbol in split_production(body, known, lengths)])
+        return grammar
+
+    def add(self, head, body):
+        """Appends the rule head -> body (symbol ids)."""
+        self.heads.append(head)
+        self.bodies.extend(body)
+        self.offsets.append(len(self.bodies))
+
+    def __len__(self):
+        return len(self.heads)
+
+    def body(self, rule):
+        return tuple(self.bodies[self.offsets[rule]:self.offsets[rule + 1]])
+
+    def __iter__(self):
+        """(head, body) id pairs in rule order."""
+        heads, offsets, bodies = self.heads, self.offsets, self.bodies
+        for rule in range(len(heads)):
+            yield heads[rule], tuple(bodies[offsets[rule]:offsets[rule + 1]])
+
+    def items(self):
+        """(head, [bodies]) pairs, heads in order of first appearance."""
+        grouped = {}
+        for head, body in self:
+            grouped.setdefault(head, []).append(body)
+        return grouped.items()
+
+    def names(self, body):
+        """Body ids as a tuple of symbol names."""
+        return tuple(self.symbols.names[symbol] for symbol in body)
+
+    def to_productions(self, as_strings=False):
+        """
+        Production dict with tuples of names as bodies (the CFGtoCNFConverter
+        form). With as_strings, a body is joined into a string ("ε" when
+        empty) only if from_productions would split it back into the same
+        symbols: its multi-character names are heads, and no neighbours
+        run together into another name. Other bodies stay tuples.
+        """
+        if as_strings:
+            heads = {self.symbols.name(head) for head in set(self.heads)}
+            known = set(self.symbols.names)
+            lengths = symbol_lengths(known)
+        productions = {}
+        for head, bodies in self.items():
+            bodies = [self.names(body) for body in bodies]
+            if as_strings:
+                bodies = [
+                    "".join(body) or EPSILON
+                    if all(len(symbol) == 1 or symbol in heads for symbol in body)
+                    and split_production("".join(body), known, lengths) == body
+                    else body
+                    for body in bodies
+                ]
+            productions[self.symbols.name(head)] = bodies
+        return productions
+
+    @property
+    def nbytes(self):
+        """Bytes held by the rule arrays (the symbol table not included)."""
+        return sum(len(part) * part.itemsize for part in (self.heads, self.offsets, self.bodies))
@@ -0,0 +1,162 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch matching falls back to a loop
+    np = None
+
+DEAD = -1  # Table entry for "no transition" (the implicit dead state)
+
+
+class CompiledDFA:
+    """
+    Integer-indexed form of a deterministic finite automaton.
+
+    States are numbered 0..n-1 (breadth-first from the start state) and symbols
+    are mapped to columns. The transition table is a flat array('i') where
+    table[state * stride + column] is the next state number, or DEAD.
+    """
+
+    dead = DEAD
+
+    def __init__(self, symbols, table, accepting, start=0, state_names=None):
+        self.symbols = list(symbols)                                   # column -> symbol
+        self.columns = {symbol: i for i, symbol in enumerate(self.symbols)}  # symbol -> column
+        self.stride = len(self.symbols)
+        self.table = table            # flat array('i'), one row per state
+        self.accepting = accepting    # bytearray, 1 for final states
+        self.start = start
+        self.state_names = state_names  # optional state number -> original name
+        self._batch = None  # NumPy tables for match_many, built on first use
+
+    @property
+    def n_states(self):
+        return len(self.accepting)
+
+    # Extra codes used in padded batches (see encode_many)
+    @property
+    def foreign_code(self):
+        return self.stride  # symbol outside the alphabet
+
+    @property
+    def pad_code(self):
+        return self.stride + 1  # padding after the end of a shorter string
+
+    def match(self, input_string):
+        """Runs the table on the input: one lookup per character, no allocation."""
+        table = self.table
+        columns = self.columns
+        stride = self.stride
+        state = self.start
+
+        for char in input_string:
+            column = columns.get(char)
+            if column is None:  # Symbol outside the alphabet
+                return False
+            state = table[state * stride + column]
+            if state < 0:  # Fell into the dead state
+                return False
+
+        return bool(self.accepting[state])
+
+    def encode_many(self, strings):
+        """
+        Encodes strings into a padded 2-D int32 NumPy array (one row per string).
+        Symbols map to their column, unknown characters to foreign_code and the
+        tail of shorter rows to pad_code.
+        """
+        if np is None:
+            raise ImportError("encode_many() requires numpy")
+
+        lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+        width = int(lengths.max()) if len(strings) else 0
+        codes = np.full((len(strings), width), self.pad_code, dtype=np.int32)
+        if not width:
+            return codes
+
+        # Code points of all strings at once, then one lookup for every character
+        points = np.frombuffer("".join(strings).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        single = [(ord(symbol), column) for symbol, column in self.columns.items() if len(symbol) == 1]
+        size = max([int(points.max())] + [point for point, _ in single]) + 1
+        lookup = np.full(size, self.foreign_code, dtype=np.int32)
+        for point, column in single:
+            lookup[point] = column
+
+        # Row-major fill of the non-padded cells keeps the concatenation order
+        codes[np.arange(width) < lengths[:, None]] = lookup[points]
+        return codes
+
+    def _batch_table(self):
+        # (n + 1) x (k + 2) table: row n is the dead state, column k sends
+        # foreign symbols to it and column k + 1 (padding) keeps the state
+        if self._batch is None:
+            n, k = self.n_states, self.stride
+            batch = np.empty((n + 1, k + 2), dtype=np.int32)
+            batch[:n, :k] = np.asarray(self.table, dtype=np.int32).reshape(n, k)
+            batch[:n, :k][batch[:n, :k] == DEAD] = n
+            batch[n, :] = n
+            batch[:, k] = n
+            batch[:, k + 1] = np.arange(n + 1)
+            accepting = np.zeros(n + 1, dtype=bool)
+            accepting[:n] = np.frombuffer(bytes(self.accepting), dtype=np.uint8) != 0
+            self._batch = (batch, accepting)
+        return self._batch
+
+    def match_many(self, strings):
+        """
+        Matches a batch of strings (a list, or a padded array from encode_many).
+        All strings advance together, one symbol column per step, and the result
+        is a boolean NumPy array. Without numpy a list of bools is returned.
+        """
+        if np is None:
+            return [self.match(s) for s in strings]
+
+        codes = strings if isinstance(strings, np.ndarray) else self.encode_many(strings)
+        batch, accepting = self._batch_table()
+        states = np.full(codes.shape[0], self.start, dtype=np.int32)
+        for column in codes.T:
+            states = batch[states, column]
+        return accepting[states]
+
+    def step(self, state, symbol):
+        """Single transition, DEAD if there is none."""
+        column = self.columns.get(symbol)
+        if column is None or state < 0:
+            return DEAD
+        return self.table[state * self.stride + column]
+
+    def is_accepting(self, state):
+        return state >= 0 and bool(self.accepting[state])
+
+    def signature(self):
+        """Hashable key of the table; equal for minimized equivalent automata."""
+        return (tuple(self.symbols), self.start, self.table.tobytes(), bytes(self.accepting))
+
+    def __repr__(self):
+        return f"CompiledDFA(states={self.n_states}, symbols={self.symbols!r})"
+
+
+def compile_transitions(start_state, symbols, successor, is_final):
+    """
+    Builds a CompiledDFA by breadth-first exploration from start_state.
+    successor(state, symbol) returns the next state or None; is_final(state)
+    tells whether the state is accepting. Only reachable states are numbered.
+    """
+    symbols = list(symbols)
+    index = {start_state: 0}
+    order = [start_state]
+    table = array("i")
+
+    for state in order:  # order grows while we walk it (BFS queue)
+        for symbol in symbols:
+            target = successor(state, symbol)
+            if target is None:
+                table.append(DEAD)
+                continue
+            if target not in index:
+                index[target] = len(order)
+                order.append(target)
+            table.append(index[target])
+
+    accepting = bytearray(1 if is_final(state) else 0 for state in order)
+    return CompiledDFA(symbols, table, accepting, start=0, state_names=order)
@@ -0,0 +1,112 @@
+import random
+
+EPSILON = "ε"
+
+
+def symbol_lengths(symbols):
+    """Lengths of the multi-character symbols, longest first, for split_production."""
+    return sorted({len(symbol) for symbol in symbols if len(symbol) > 1}, reverse=True)
+
+
+def split_production(body, symbols, lengths=None):
+    """
+    Splits a production body into a tuple of symbols. Lists/tuples are taken
+    as they are; strings are split greedily on the longest known symbol, so
+    multi-character names like "D1" survive ("ε" is the empty body). When
+    splitting many bodies, pass lengths=symbol_lengths(symbols) once.
+    """
+    if not isinstance(body, str):
+        return tuple(symbol for symbol in body if symbol != EPSILON)
+    if body == EPSILON:
+        return ()
+
+    if lengths is None:
+        lengths = symbol_lengths(symbols)
+    parts = []
+    i = 0
+    while i < len(body):
+        for length in lengths:
+            if body[i:i + length] in symbols:
+                parts.append(body[i:i + length])
+                i += length
+                break
+        else:
+            parts.append(body[i])
+            i += 1
+    return tuple(parts)
+
+
+class DerivationEngine:
+    """
+    Random derivations of a context-free grammar.
+
+    Productions are pre-split into symbols once; non-terminals become small
+    ints and terminals stay strings. A derivation keeps a stack of pending
+    symbols (the leftmost on top), so each step only touches the expanded
+    non-terminal instead of rescanning the whole sentential form.
+    """
+
+    def __init__(self, grammar, seed=None, max_steps=1000, rng=None):
+        symbols = set(grammar.VN) | set(grammar.VT)
+        lengths = symbol_lengths(symbols)
+        self.nonterminals = sorted(grammar.VN)
+        index = {nt: i for i, nt in enumerate(self.nonterminals)}
+
+        # rules[i]: bodies of non-terminal i, reversed so they can be pushed as is
+        self.rules = [[] for _ in self.nonterminals]
+        for head, bodies in grammar.P.items():
+            if head not in index:
+                continue
+            for body in bodies:
+                parts = split_production(body, symbols, lengths)
+                self.rules[index[head]].append(
+                    tuple(index.get(symbol, symbol) for symbol in reversed(parts))
+                )
+
+        self.start = index[grammar.S]
+        self.max_steps = max_steps
+        self.random = rng if rng is not None else random.Random(seed)
+        self.failures = 0  # derivations abandoned at max_steps or at a dead end
+
+    def derive(self):
+        """One random string, or None if max_steps replacements were not enough."""
+        rules = self.rules
+        randrange = self.random.randrange
+        output = []
+        pending = [self.start]
+        steps = 0
+
+        while pending:
+            symbol = pending.pop()
+            if symbol.__class__ is str:  # Terminal
+                output.append(symbol)
+                continue
+
+            bodies = rules[symbol]
+            if steps == self.max_steps or not bodies:
+                self.failures += 1
+                return None
+            pending.extend(bodies[randrange(len(bodies))])
+            steps += 1
+
+        return "".join(output)
+
+    def generate(self, count, max_attempts=None):
+        """
+        Yields count derived strings. Raises RuntimeError when more than
+        max_attempts (default 100 * count) derivations were needed.
+        """
+        if max_attempts is None:
+            max_attempts = 100 * count
+        produced = attempts = 0
+        while produced < count:
+            if attempts >= max_attempts:
+                raise RuntimeError(
+                    f"Only {produced} of {count} strings derived in {attempts} attempts "
+                    f"(max_steps={self.max_steps})"
+                )
+            attempts += 1
+            result = self.derive()
+            if result is not None:
+                produced += 1
+                yield result
@@ -0,0 +1,72 @@
+from lab1lab2.compiled_automaton import DEAD
+
+
+def viable_states(compiled, max_length):
+    """
+    viable[r][q] is 1 when some string of exactly r symbols leads from state q
+    to a final state; used to cut every branch that cannot produce output.
+    """
+    table, stride = compiled.table, compiled.stride
+    viable = [bytearray(compiled.accepting)]
+    for _ in range(max_length):
+        previous = viable[-1]
+        row = bytearray(compiled.n_states)
+        for state in range(compiled.n_states):
+            for target in table[state * stride:(state + 1) * stride]:
+                if target != DEAD and previous[target]:
+                    row[state] = 1
+                    break
+        viable.append(row)
+    return viable
+
+
+def shortlex(compiled, max_length, min_length=0):
+    """
+    Yields every accepted string with min_length <= length <= max_length in
+    shortlex order (by length, then by symbol order of the table columns).
+
+    Each length is a depth-first walk that only enters states from which an
+    accepted string of the remaining length exists, so every branch produces
+    output and memory stays O(max_length) however many strings are yielded.
+    """
+    table, stride, symbols = compiled.table, compiled.stride, compiled.symbols
+    viable = viable_states(compiled, max_length)
+    start = compiled.start
+
+    for length in range(min_length, max_length + 1):
+        if not viable[length][start]:
+            continue
+        if length == 0:
+            yield ""
+            continue
+
+        prefix = [None] * length
+        states = [start]   # states[d]: state after d symbols
+        columns = [0]      # columns[d]: next column to try at depth d
+        while states:
+            depth = len(states) - 1
+            state = states[depth]
+            remaining = length - depth - 1
+            allowed = viable[remaining]
+
+            column = columns[depth]
+            base = state * stride
+            target = DEAD
+            while column < stride:
+                target = table[base + column]
+                if target != DEAD and allowed[target]:
+                    break
+                column += 1
+
+            if column == stride:  # Branch exhausted: backtrack
+                states.pop()
+                columns.pop()
+                continue
+
+            columns[depth] = column + 1
+            prefix[depth] = symbols[column]
+            if remaining:
+                states.append(target)
+                columns.append(0)
+            else:
+                yield "".join(prefix)
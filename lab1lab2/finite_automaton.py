@@ -1,5 +1,27 @@
+import io
+import random
+from collections import deque
+from lab1lab2.automaton_export import export_automaton
+from lab1lab2.automaton_file import load_compiled, save_compiled
 from lab1lab2.base import Grammar
-import graphviz
+from lab1lab2.bitset_nfa import EPSILON, BitsetNFA
+from lab1lab2.compiled_automaton import DEAD, compile_transitions
+from lab1lab2.enumeration import shortlex
+from lab1lab2.hopcroft import minimize_compiled
+from lab1lab2.language_count import LanguageCounter
+from lab1lab2.lazy_dfa import LazyDFA
+from lab1lab2.parallel_match import match_corpus
+from lab1lab2.product import DeterministicView, ProductAutomaton, find_counterexample
+from lab1lab2.stream_matcher import StreamMatcher
+
+
+def _targets(next_states):
+    """Transition targets as a collection (DFA tables store a single state name)."""
+    if isinstance(next_states, str):
+        return (next_states,)
+    return next_states
+
+
 class FiniteAutomaton:
     def __init__(self, states, alphabet, transitions, start_state, final_states):
         self.Q = states             
@@ -7,10 +29,140 @@ class FiniteAutomaton:
         self.delta = transitions    
         self.q0 = start_state      
         self.F = final_states      
+        self._compiled = None  # CompiledDFA, False for NFAs, None if not checked yet
+        self._dfa_compiled = None  # Table of the determinized FA (for NFAs)
+        self._bitset = None  # BitsetNFA view, built on first use
+        self._lazy = None  # LazyDFA used by the "lazy" engine
+        self._counter = None  # LanguageCounter with cached count tables
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        """Builds a FiniteAutomaton (states D0..Dn) from a CompiledDFA."""
+        names = [f"D{state}" for state in range(compiled.n_states)]
+        transitions = {}
+        for state, name in enumerate(names):
+            transitions[name] = {}
+            for column, symbol in enumerate(compiled.symbols):
+                target = compiled.table[state * compiled.stride + column]
+                if target != DEAD:
+                    transitions[name][symbol] = names[target]
+
+        fa = cls(
+            states=set(names),
+            alphabet=set(compiled.symbols),
+            transitions=transitions,
+            start_state=names[compiled.start],
+            final_states={names[state] for state in range(compiled.n_states) if compiled.accepting[state]}
+        )
+        fa._compiled = compiled
+        return fa
+
+    def save_compiled(self, path):
+        """Saves the compiled table (of the determinized FA for NFAs) to a binary file."""
+        save_compiled(self._deterministic_compiled(), path)
+
+    @staticmethod
+    def load_compiled(path, use_mmap=True):
+        """
+        Loads a file written by save_compiled as a CompiledDFA (match, match_many)
+        backed by mmap. Use FiniteAutomaton.from_compiled for the dict form.
+        """
+        return load_compiled(path, use_mmap=use_mmap)
 
-    def stringBelongToLanguage(self, input_string):
-        #Check if the input string belongs to the language
-        current_states = set([self.q0])
+    def compile(self):
+        """
+        Builds the integer transition table (CompiledDFA) of a deterministic FA
+        and caches it for stringBelongToLanguage. Call invalidate() after
+        editing Q, Sigma, delta, q0 or F so that no engine uses an old table.
+        """
+        if not self.is_deterministic():
+            raise ValueError("compile() needs a DFA; use convert_ndfa_to_dfa() first")
+
+        def successor(state, symbol):
+            for next_state in _targets(self.delta.get(state, {}).get(symbol, ())):
+                return next_state
+            return None
+
+        self._compiled = compile_transitions(
+            self.q0, sorted(self.Sigma), successor, lambda state: state in self.F
+        )
+        return self._compiled
+
+    def invalidate(self):
+        """
+        Drops every structure cached from the transitions (compiled tables,
+        bitset view, lazy DFA, count tables); they are rebuilt on next use.
+        """
+        self._compiled = None
+        self._dfa_compiled = None
+        self._bitset = None
+        self._lazy = None
+        self._counter = None
+
+    def _get_compiled(self):
+        # Compile once on first use; NFAs keep using the dict-based simulation
+        if self._compiled is None:
+            if self.is_deterministic():
+                self.compile()
+            else:
+                self._compiled = False
+        return self._compiled or None
+
+    def _deterministic_compiled(self):
+        # Table of this FA, or of its subset construction when it is an NFA
+        compiled = self._get_compiled()
+        if compiled is None:
+            if self._dfa_compiled is None:
+                self._dfa_compiled = self.convert_ndfa_to_dfa().compile()
+            compiled = self._dfa_compiled
+        return compiled
+
+    def encode_many(self, strings):
+        """Encodes strings as a padded NumPy array of symbol codes for match_many."""
+        return self._deterministic_compiled().encode_many(strings)
+
+    def match_many(self, strings):
+        """
+        Checks a whole batch of strings at once and returns a boolean array with
+        the same answers as stringBelongToLanguage. NFAs are determinized once.
+        """
+        return self._deterministic_compiled().match_many(strings)
+
+    def match_parallel(self, strings, workers=None, chunk_size=10000):
+        """
+        Matches a (possibly lazy) iterable of strings on a process pool that
+        shares one compiled table, yielding the same bools as the serial
+        stringBelongToLanguage, in input order.
+        """
+        return match_corpus(self._deterministic_compiled(), strings, workers=workers, chunk_size=chunk_size)
+
+    def stringBelongToLanguage(self, input_string, engine="auto"):
+        """
+        Check if the input string belongs to the language.
+        engine: "auto" (table for DFAs, sets for NFAs), "table" (DFAs only),
+        "sets" (set-based simulation), "bitset" (bit-parallel NFA simulation)
+        or "lazy" (on-the-fly determinization, see lazy_dfa()). All but "sets"
+        keep structures built from delta; see invalidate().
+        """
+        if engine == "auto":
+            compiled = self._get_compiled()
+            if compiled is not None:  # DFA: one table lookup per character
+                return compiled.match(input_string)
+        elif engine == "table":
+            compiled = self._get_compiled()
+            if compiled is None:
+                raise ValueError("The table engine needs a DFA; use convert_ndfa_to_dfa() first")
+            return compiled.match(input_string)
+        elif engine == "bitset":
+            return self._bitset_nfa().match(input_string, self.Sigma)
+        elif engine == "lazy":
+            if self._lazy is None:
+                self._lazy = self.lazy_dfa()
+            return self._lazy.match(input_string)
+        elif engine != "sets":
+            raise ValueError(f"Unknown engine: {engine!r}")
+
+        current_states = self._epsilon_closure([self.q0])
         
         for char in input_string:
             if char not in self.Sigma:
@@ -20,17 +172,29 @@ class FiniteAutomaton:
             # For each current state, find all possible next states
             for state in current_states:
                 if state in self.delta and char in self.delta[state]:
-                    for next_state in self.delta[state][char]:
+                    for next_state in _targets(self.delta[state][char]):
                         next_states.add(next_state)
                     
             if not next_states:
                 return False
                 
-            current_states = next_states
+            current_states = self._epsilon_closure(next_states)
             
         # Check if any current state is a final state
         return bool(current_states.intersection(self.F))
 
+    def _epsilon_closure(self, states):
+        # States reachable from the given ones through ε-transitions only
+        closure = set(states)
+        stack = list(closure)
+        while stack:
+            state = stack.pop()
+            for next_state in _targets(self.delta.get(state, {}).get(EPSILON, ())):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    stack.append(next_state)
+        return closure
+
     def to_regular_grammar(self):
         """
         Convert the finite automaton to a Regular Grammar (RG)
@@ -45,7 +209,7 @@ class FiniteAutomaton:
 
             if state in self.delta:
                 for symbol, next_states in self.delta[state].items():
-                    for next_state in next_states:
+                    for next_state in _targets(next_states):
                         productions[state].append(f"{symbol}{next_state}")
 
             # If state is final, add epsilon (ε) transition
@@ -60,91 +224,187 @@ class FiniteAutomaton:
         for state, transitions in self.delta.items():
             seen_symbols = set()
             for symbol, next_states in transitions.items():
-                if symbol == "ε":  # If an ε-transition exists → NDFA
+                if symbol == EPSILON:  # If an ε-transition exists → NDFA
                     return False
-                if len(next_states) > 1:  # If multiple destinations for a symbol → NDFA
+                if len(_targets(next_states)) > 1:  # If multiple destinations for a symbol → NDFA
                     return False
                 if symbol in seen_symbols:
                     return False  # More than one transition for the same symbol
                 seen_symbols.add(symbol)
         return True
 
-    def convert_ndfa_to_dfa(self):
-        """ Converts an NDFA to a DFA using the subset construction method. """
-        #dfa_states = {}  # Maps DFA state sets to names
-        queue = [frozenset([self.q0])]  # Start DFA state as a set
-        dfa_start = queue[0]  # DFA start state
-        dfa_transitions = {}  # DFA transition table
-        dfa_final_states = set()  # DFA final states
+    def _edges(self):
+        """Every transition as a (state, symbol, next_state) triple."""
+        for state, transitions in self.delta.items():
+            for symbol, next_states in transitions.items():
+                for next_state in _targets(next_states):
+                    yield state, symbol, next_state
 
-        seen_states = {}  # Dictionary to store unique state sets and map them to names
+    def _bitset_nfa(self):
+        # Integer-numbered view of the FA shared by the matching engines (see invalidate())
+        if self._bitset is None:
+            self._bitset = BitsetNFA(self.q0, self.F, self._edges())
+        return self._bitset
 
-        while queue:
-            current = queue.pop(0)  # Get current DFA state (set of NFA states)
+    def _language_counter(self):
+        if self._counter is None:
+            self._counter = LanguageCounter(self._deterministic_compiled())
+        return self._counter
 
-            # Assign a unique state name if not already assigned
-            if current not in seen_states:
-                seen_states[current] = f"D{len(seen_states)}"
+    def count_strings(self, length):
+        """Exact number of accepted strings of the given length."""
+        return self._language_counter().count(length)
 
-            current_name = seen_states[current]  # Get the assigned DFA state name
+    def sample_strings(self, length, count=1, seed=None):
+        """
+        Yields count accepted strings of the given length, each drawn uniformly
+        from all of them. Yields nothing if the language has no such string.
+        """
+        counter = self._language_counter()
+        rng = random.Random(seed)
+        for _ in range(count):
+            sample = counter.sample(length, rng)
+            if sample is None:
+                return
+            yield sample
+
+    def enumerate_strings(self, max_length, min_length=0):
+        """
+        Lazily yields all accepted strings up to max_length in shortlex order
+        (shorter first, then alphabetical), using memory independent of the
+        number of strings produced.
+        """
+        return shortlex(self._deterministic_compiled(), max_length, min_length=min_length)
+
+    def _deterministic_view(self):
+        # DFAs use their table; NFAs are determinized lazily through bitsets
+        return DeterministicView(self._get_compiled() or self._bitset_nfa(), self.Sigma)
+
+    def product(self, other, mode="intersection"):
+        """
+        Lazy ProductAutomaton with another FA; mode is "intersection", "union",
+        "difference" or "symmetric_difference". Pairs are built on demand.
+        """
+        return ProductAutomaton(self._deterministic_view(), other._deterministic_view(), mode)
+
+    def intersection(self, other):
+        """DFA for strings accepted by both automata (reachable pairs only)."""
+        return FiniteAutomaton.from_compiled(self.product(other, "intersection").compile())
+
+    def union(self, other):
+        """DFA for strings accepted by either automaton."""
+        return FiniteAutomaton.from_compiled(self.product(other, "union").compile())
+
+    def difference(self, other):
+        """DFA for strings accepted by this automaton but not by other."""
+        return FiniteAutomaton.from_compiled(self.product(other, "difference").compile())
+
+    def find_counterexample(self, other):
+        """
+        A string accepted by exactly one of the two automata, or None if they
+        accept the same language (Hopcroft-Karp, stops at the first difference).
+        """
+        return find_counterexample(self._deterministic_view(), other._deterministic_view())
+
+    def is_equivalent(self, other):
+        """True if both automata accept the same language."""
+        return self.find_counterexample(other) is None
+
+    def lazy_dfa(self, cache_size=4096, eviction="lru"):
+        """
+        Returns a LazyDFA matcher that determinizes on the fly, keeping at most
+        cache_size DFA states ("lru" or "flush" eviction). Its stats() show
+        cache hits, misses and flushes.
+        """
+        return LazyDFA(self._bitset_nfa(), self.Sigma, cache_size=cache_size, eviction=eviction)
+
+    def stream_matcher(self):
+        """
+        Returns a StreamMatcher for input that arrives in chunks (feed/finish).
+        DFAs run on the compiled table, NFAs on the bitset simulation.
+        """
+        return StreamMatcher(self._get_compiled() or self._bitset_nfa(), self.Sigma)
+
+    def convert_ndfa_to_dfa(self, max_states=None):
+        """
+        Converts an NDFA to a DFA using the subset construction method.
+        Subsets of NFA states are int bitmasks and ε-transitions are followed.
+        If max_states is given, a ValueError is raised as soon as the DFA
+        would need more states than that.
+        """
+        nfa = BitsetNFA(self.q0, self.F, self._edges())  # Always from the current delta
+        symbols = [symbol for symbol in sorted(self.Sigma) if symbol != EPSILON]
+
+        seen_states = {nfa.start: "D0"}  # Bitmask of NFA states -> DFA state name
+        queue = deque([nfa.start])
+        dfa_transitions = {}  # DFA transition table
+        dfa_final_states = set()  # DFA final states
+
+        while queue:
+            current = queue.popleft()  # Current DFA state (set of NFA states)
+            current_name = seen_states[current]
+            dfa_transitions[current_name] = {}
 
             # If any NFA final state is in this DFA state, mark DFA state as final
-            if any(state in self.F for state in current):
+            if nfa.is_accepting(current):
                 dfa_final_states.add(current_name)
 
-            # Initialize transition table for this DFA state
-            if current_name not in dfa_transitions:
-                dfa_transitions[current_name] = {}
+            for symbol in symbols:
+                next_state = nfa.step(current, symbol)
+                if not next_state:  # No transition on this symbol
+                    continue
 
-            for symbol in self.Sigma:  # Iterate over alphabet
-                # Find the next DFA state (set of NFA states)
-                next_state = frozenset(
-                    sum([list(self.delta.get(s, {}).get(symbol, [])) for s in current], [])
-                )
+                if next_state not in seen_states:
+                    if max_states is not None and len(seen_states) >= max_states:
+                        raise ValueError(
+                            f"Subset construction exceeded max_states={max_states} "
+                            f"({nfa.n_states}-state NFA)"
+                        )
+                    seen_states[next_state] = f"D{len(seen_states)}"
+                    queue.append(next_state)  # Add new state to process
 
-                if next_state:  # If the new state is non-empty
-                    if next_state not in seen_states:
-                        seen_states[next_state] = f"D{len(seen_states)}"
-                        queue.append(next_state)  # Add new state to process
-
-                    dfa_transitions[current_name][symbol] = seen_states[next_state]  # Set DFA transition
+                dfa_transitions[current_name][symbol] = seen_states[next_state]  # Set DFA transition
 
         return FiniteAutomaton(
             states=set(seen_states.values()),
             alphabet=self.Sigma,
             transitions=dfa_transitions,
-            start_state=seen_states[dfa_start],
+            start_state="D0",
             final_states=dfa_final_states
         )
 
-    def visualize(self, filename="finite_automaton"):
+    def minimize(self):
         """
-        Generate a graphical representation of the finite automaton using Graphviz.
+        Returns the minimal equivalent DFA (Hopcroft's algorithm). Unreachable
+        and dead states are removed, equivalent states merged, and the result
+        is numbered canonically, so equivalent automata give identical DFAs.
         """
-        dot = graphviz.Digraph(format="png")
+        return FiniteAutomaton.from_compiled(minimize_compiled(self._deterministic_compiled()))
 
-        # Ensure all states are correctly named
-        state_labels = {state: state for state in self.Q}  # Ensures state names remain correct
-
-        # Add states to the graph
-        for state in self.Q:
-            if state in self.F:
-                dot.node(state_labels[state], shape="doublecircle")  # Final states: double circle
-            elif state == self.q0:
-                dot.node(state_labels[state], shape="circle", style="bold")  # Start state: bold circle
-            else:
-                dot.node(state_labels[state], shape="circle")
+    def export_dot(self, output, max_states=None, around=None, radius=2):
+        """
+        Write the automaton in DOT format to a path or text file, without
+        Graphviz. Parallel edges are merged into one edge labelled with a
+        symbol class ("a-c,x"). max_states keeps only the first states reached
+        from the start state; around (a state or list of states) keeps only
+        the states within radius transitions of them.
+        """
+        export_automaton(output, "dot", self.Q, self._edges(), self.q0, self.F,
+                         max_states=max_states, around=around, radius=radius)
 
-        # Add transitions
-        for state, transitions in self.delta.items():
-            for symbol, next_state in transitions.items():
-                # Ensure next_state is correctly mapped
-                next_state_label = state_labels.get(next_state, str(next_state))
-                dot.edge(state_labels[state], next_state_label, label=symbol)
+    def export_json(self, output, max_states=None, around=None, radius=2):
+        """Same as export_dot, as JSON (states, start, final states and merged edges)."""
+        export_automaton(output, "json", self.Q, self._edges(), self.q0, self.F,
+                         max_states=max_states, around=around, radius=radius)
 
-        # Add an invisible start node to indicate the start state
-        dot.node("start", shape="none")  # Invisible starting point
-        dot.edge("start", state_labels[self.q0])  # Arrow pointing to the start state
+    def visualize(self, filename="finite_automaton", view=True, max_states=None, around=None, radius=2):
+        """
+        Generate a graphical representation of the finite automaton using Graphviz.
+        With view=False the PNG is only written (for headless machines); the
+        other options select the states drawn, as in export_dot.
+        """
+        import graphviz  # Only needed for rendering; export_dot works without it
 
-        # Render the graph
-        dot.render(filename, view=True)
+        dot = io.StringIO()
+        self.export_dot(dot, max_states=max_states, around=around, radius=radius)
+        graphviz.Source(dot.getvalue(), format="png").render(filename, view=view)
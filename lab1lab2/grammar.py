@@ -1,60 +1,129 @@
 # grammar.py
 import random
 from lab1lab2.base import Grammar
+from lab1lab2.compact_grammar import CompactGrammar
+from lab1lab2.derivation import EPSILON, DerivationEngine
 from lab1lab2.finite_automaton import FiniteAutomaton
+from lab1lab2.grammar_analysis import grammar_analysis, productions_key
+
+
+def _fresh_state(states, prefix):
+    """Adds and returns prefix, or prefix followed by the first free number."""
+    name, number = prefix, 0
+    while name in states:
+        number += 1
+        name = f"{prefix}{number}"
+    states.add(name)
+    return name
+
 
   # Start symbol
 class ExtendedGrammar(Grammar):
-    def generate_string(self):
-        #Generates a valid string by replacing non-terminals until only terminals remain. 
-        current = self.S  
-        steps = 0
+    def generate_string(self, max_steps=50):
+        #Generates a valid string by replacing non-terminals until only terminals remain.
+        #Returns None if max_steps replacements were not enough.
+        engine = DerivationEngine(self, max_steps=max_steps, rng=random)
+        return engine.derive()
+
+    def derivation_engine(self, seed=None, max_steps=1000):
+        """Reusable DerivationEngine; seed it to make the generated strings reproducible."""
+        return DerivationEngine(self, seed=seed, max_steps=max_steps)
+
+    def generate_strings(self, count, seed=None, max_steps=1000):
+        """Yields count random strings of the language (see DerivationEngine.generate)."""
+        return self.derivation_engine(seed=seed, max_steps=max_steps).generate(count)
+
+
+    def _cached(self, name, build):
+        # Results derived from the grammar, rebuilt when P, VN, VT or S change
+        key = (productions_key(self.P), frozenset(self.VN), frozenset(self.VT), self.S)
+        if getattr(self, "_cache_key", None) != key:
+            self._cache_key, self._cache = key, {}
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
 
-        while any(char in self.VN for char in current) and steps < 50:  # Limit steps to prevent infinite loops
-            nt_to_replace = random.choice([char for char in current if char in self.VN])  
-            production = random.choice(self.P[nt_to_replace])  
-            current = current.replace(nt_to_replace, production, 1)  
-            steps += 1
+    def analysis(self):
+        """Shared GrammarAnalysis (interned rules, nullable, FIRST, FOLLOW, ...)."""
+        return self._cached("analysis", lambda: grammar_analysis(self.P, self.S, set(self.VN) | set(self.VT)))
 
-        return current if all(char in self.VT for char in current) else None
+    def compact(self):
+        """The productions as a CompactGrammar (int arrays), rebuilt when the grammar changes."""
+        return self._cached("compact", lambda: CompactGrammar.from_productions(self.P, set(self.VN) | set(self.VT)))
 
+    @classmethod
+    def from_compact(cls, compact, start_symbol, VT=None):
+        """
+        ExtendedGrammar from a CompactGrammar; by default every symbol without
+        rules is a terminal. Bodies are tuples of symbol names (("ε",) when
+        empty), so multi-character symbols keep their boundaries.
+        """
+        productions = {
+            head: [body or (EPSILON,) for body in bodies]
+            for head, bodies in compact.to_productions().items()
+        }
+        VN = set(productions)
+        if VT is None:
+            VT = {name for name in compact.symbols.names if name not in VN}
+        return cls(VN, VT, productions, start_symbol)
+
+    def _automaton(self):
+        # toFiniteAutomaton() result, rebuilt only when the grammar changes
+        return self._cached("automaton", self.toFiniteAutomaton)
+
+    def count_strings(self, length):
+        """Number of strings of the given length accepted by the grammar's automaton."""
+        return self._automaton().count_strings(length)
+
+    def sample_strings(self, length, count=1, seed=None):
+        """Uniformly drawn strings of the given length (see FiniteAutomaton.sample_strings)."""
+        return self._automaton().sample_strings(length, count=count, seed=seed)
+
+    def enumerate_strings(self, max_length, min_length=0):
+        """All strings of the grammar's automaton up to max_length, in shortlex order."""
+        return self._automaton().enumerate_strings(max_length, min_length=min_length)
 
     def toFiniteAutomaton(self):
-       #Convert the grammar to a finite automaton
-        states = set(self.VN)  # non-terminals -> statess
-        transitions = {}
-        final_states = set()
+        """
+        NFA of a right-linear grammar: a state per non-terminal plus one final
+        state. A -> a1..ak B goes from A over a1..ak to B through fresh states
+        (an ε-move when k = 0), A -> a1..ak goes to the final state and A -> ε
+        makes A final. ValueError if a non-terminal is not at the end of a body.
+        """
+        nonterminals = set(self.VN) | set(self.P)
+        states = set(nonterminals)
+        final_state = _fresh_state(states, "F")
+        transitions = {state: {} for state in states}
+        final_states = {final_state}
+        analysis = self.analysis()
 
-        # Process each production rule to create FA transitions
         for non_terminal in self.P:
-            transitions[non_terminal] = {}  
-
-            for production in self.P[non_terminal]:
-                if len(production) == 1 and production in self.VT:
-                    # Terminal-only production -> final state
-                    if production not in transitions[non_terminal]:
-                        transitions[non_terminal][production] = set()
-                    transitions[non_terminal][production].add(non_terminal)  # Self-loop for terminal
-                        
-                    final_states.add(non_terminal)
-                    
+            for production in analysis.productions_of(non_terminal):
+                if not production:
+                    final_states.add(non_terminal)  # ε-production
+                    continue
+                if production[-1] in nonterminals:
+                    terminals, target = production[:-1], production[-1]
                 else:
-                    # Handle multi-symbol productions 
-                    first_symbol = production[0]
-                    next_state = production[1] if len(production) > 1 else None
-
-                    if first_symbol not in transitions[non_terminal]:
-                        transitions[non_terminal][first_symbol] = set()
-                        
-                    if next_state:
-                        transitions[non_terminal][first_symbol].add(next_state)
-                    else:
-                        # If no next state, this state is final
-                        final_states.add(non_terminal)
+                    terminals, target = production, final_state
+                if any(symbol in nonterminals for symbol in terminals):
+                    raise ValueError(f"Not a right-linear rule: {non_terminal} -> {' '.join(production)}")
+                if not terminals:
+                    transitions[non_terminal].setdefault(EPSILON, set()).add(target)  # Unit rule
+                    continue
+
+                # Fresh states between the terminals, so each rule keeps its own path
+                state = non_terminal
+                for symbol in terminals[:-1]:
+                    next_state = _fresh_state(states, f"{non_terminal}_")
+                    transitions[next_state] = {}
+                    transitions[state].setdefault(symbol, set()).add(next_state)
+                    state = next_state
+                transitions[state].setdefault(terminals[-1], set()).add(target)
 
         fa = FiniteAutomaton(
             states=states,
-            alphabet=self.VT,
+            alphabet=set(self.VT),
             transitions=transitions,
             start_state=self.S,
             final_states=final_states
@@ -63,6 +132,13 @@ class ExtendedGrammar(Grammar):
         return fa
 
     def classify_chomsky_hierarchy(self):
+        return self._cached("classification", self._classify)
+
+    def _classify(self):
+        # Same rules as always: a head longer than one character is not
+        # context-free unless it is a non-terminal, and a regular body is
+        # lower case, optionally followed by one upper-case symbol. Tuple
+        # bodies are checked as the string of their symbols.
         is_regular = True
         is_context_free = True
         is_context_sensitive = True
@@ -70,7 +146,7 @@ class ExtendedGrammar(Grammar):
         for lhs, rhs_list in self.P.items():
             for rhs in rhs_list:
                 # Type 2 (Context-Free) Check
-                if len(lhs) > 1:
+                if len(lhs) > 1 and lhs not in self.VN:
                     is_context_free = False
 
                 # Type 1 (Context-Sensitive) Check
@@ -78,7 +154,8 @@ class ExtendedGrammar(Grammar):
                     is_context_sensitive = False
 
                 # Type 3 (Regular) Check
-                if not (rhs.islower() or (rhs[:-1].islower() and rhs[-1].isupper())):
+                if not ("".join(rhs).islower()
+                        or ("".join(rhs[:-1]).islower() and "".join(rhs[-1:]).isupper())):
                     is_regular = False
 
         if is_regular:
@@ -88,4 +165,4 @@ class ExtendedGrammar(Grammar):
         elif is_context_sensitive:
             return "Type 1 (Context-Sensitive Grammar)"
         else:
-            return "Type 0 (Unrestricted Grammar)"
\ No newline at end of file
+            return "Type 0 (Unrestricted Grammar)"
@@ -0,0 +1,248 @@
+from collections import deque
+
+from lab1lab2.derivation import split_production, symbol_lengths
+
+END = "$"  # End-of-input marker in FOLLOW sets
+
+
+def _names(mask, names):
+    """Names of the set bits of mask."""
+    found = []
+    while mask:
+        low = mask & -mask
+        found.append(names[low.bit_length() - 1])
+        mask ^= low
+    return frozenset(found)
+
+
+def productions_key(productions):
+    """Hashable snapshot of a production dict, used to notice changes."""
+    return tuple(
+        (head, tuple(body if isinstance(body, str) else tuple(body) for body in bodies))
+        for head, bodies in productions.items()
+    )
+
+
+class GrammarAnalysis:
+    """
+    Shared precomputation for a context-free grammar given as a production
+    dict, in the ExtendedGrammar form ({"S": ["aA", "ε"]}) or the
+    CFGtoCNFConverter form ({"S": [["d", "B"], ["ε"]]}). Keys are the
+    non-terminals; every other symbol is a terminal.
+
+    Symbols are interned as ints (non-terminals first, then terminals) and
+    rules are stored once as (head, body) int tuples, indexed by head and by
+    leading terminal. nullable, productive, reachable, FIRST and FOLLOW are
+    all computed with worklists, so each rule is revisited only when one of
+    its symbols changes.
+    """
+
+    def __init__(self, productions, start_symbol, symbols=()):
+        self.start_symbol = start_symbol
+        known = set(productions) | set(symbols)
+        lengths = symbol_lengths(known)
+
+        split = {
+            head: [split_production(body, known, lengths) for body in bodies]
+            for head, bodies in productions.items()
+        }
+        self.nonterminals = list(productions)
+        terminals = set()
+        for bodies in split.values():
+            for body in bodies:
+                terminals.update(symbol for symbol in body if symbol not in productions)
+        self.terminals = sorted(terminals)
+        self.symbols = self.nonterminals + self.terminals
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.n_nonterminals = len(self.nonterminals)
+
+        index = self.index
+        self.rules = []                       # rule -> (head, body) as ints
+        self.by_head = [[] for _ in self.nonterminals]
+        self.by_leading_terminal = {}         # terminal -> rules whose body starts with it
+        for head, bodies in split.items():
+            head_id = index[head]
+            for body in bodies:
+                rule = len(self.rules)
+                body = tuple(index[symbol] for symbol in body)
+                self.rules.append((head_id, body))
+                self.by_head[head_id].append(rule)
+                if body and body[0] >= self.n_nonterminals:
+                    self.by_leading_terminal.setdefault(self.symbols[body[0]], []).append(rule)
+
+        self._compute()
+
+    def rule(self, rule):
+        """Rule as (head, body) with the symbol names."""
+        head, body = self.rules[rule]
+        return self.symbols[head], tuple(self.symbols[symbol] for symbol in body)
+
+    def productions_of(self, head):
+        """Bodies of head as tuples of symbol names."""
+        return [self.rule(rule)[1] for rule in self.by_head[self.index[head]]]
+
+    def _compute(self):
+        n = self.n_nonterminals
+        rules = self.rules
+        terminal_bit = {i: 1 << (i - n) for i in range(n, len(self.symbols))}
+
+        # Rules waiting on each non-terminal, one entry per occurrence
+        occurrences = [[] for _ in range(n)]
+        productive_left = []   # non-productive symbols left in each body
+        nullable_left = []     # non-nullable symbols left (None: has a terminal)
+        for rule, (head, body) in enumerate(rules):
+            for symbol in body:
+                if symbol < n:
+                    occurrences[symbol].append(rule)
+            productive_left.append(sum(1 for symbol in body if symbol < n))
+            nullable_left.append(None if any(symbol >= n for symbol in body) else len(body))
+
+        # nullable and productive in one worklist pass
+        nullable = bytearray(n)
+        productive = bytearray(n)
+        work = deque()
+        for rule, (head, body) in enumerate(rules):
+            if productive_left[rule] == 0 and not productive[head]:
+                productive[head] = 1
+                work.append((head, 0))
+            if nullable_left[rule] == 0 and not nullable[head]:
+                nullable[head] = 1
+                work.append((head, 1))
+        while work:
+            symbol, kind = work.popleft()
+            for rule in occurrences[symbol]:
+                head = rules[rule][0]
+                if kind == 0:
+                    productive_left[rule] -= 1
+                    if productive_left[rule] == 0 and not productive[head]:
+                        productive[head] = 1
+                        work.append((head, 0))
+                elif nullable_left[rule] is not None:
+                    nullable_left[rule] -= 1
+                    if nullable_left[rule] == 0 and not nullable[head]:
+                        nullable[head] = 1
+                        work.append((head, 1))
+
+        # FIRST as terminal bitmasks: seed from leading terminals, then
+        # propagate along "FIRST(A) includes FIRST(B)" edges
+        first = [0] * n
+        feeds = [set() for _ in range(n)]  # B -> heads whose FIRST includes FIRST(B)
+        for head, body in rules:
+            for symbol in body:
+                if symbol >= n:
+                    first[head] |= terminal_bit[symbol]
+                    break
+                feeds[symbol].add(head)
+                if not nullable[symbol]:
+                    break
+        self._propagate(first, feeds)
+
+        # FOLLOW: FIRST of what comes after each non-terminal, plus FOLLOW of
+        # the head when the rest of the body is nullable
+        end_bit = 1 << len(self.terminals)
+        follow = [0] * n
+        feeds = [set() for _ in range(n)]  # A -> non-terminals whose FOLLOW includes FOLLOW(A)
+        start = self.index.get(self.start_symbol, n)
+        if start < n:
+            follow[start] |= end_bit
+        for head, body in rules:
+            trailer = 0
+            nullable_tail = True
+            for symbol in reversed(body):
+                if symbol >= n:
+                    trailer = terminal_bit[symbol]
+                    nullable_tail = False
+                    continue
+                follow[symbol] |= trailer
+                if nullable_tail:
+                    feeds[head].add(symbol)
+                if nullable[symbol]:
+                    trailer |= first[symbol]
+                else:
+                    trailer = first[symbol]
+                    nullable_tail = False
+        self._propagate(follow, feeds)
+
+        # reachable from the start symbol
+        reachable = bytearray(n)
+        if start < n:
+            reachable[start] = 1
+            stack = [start]
+            while stack:
+                for rule in self.by_head[stack.pop()]:
+                    for symbol in rules[rule][1]:
+                        if symbol < n and not reachable[symbol]:
+                            reachable[symbol] = 1
+                            stack.append(symbol)
+
+        names = self.nonterminals
+        terminal_names = self.terminals + [END]
+        self.nullable = frozenset(names[i] for i in range(n) if nullable[i])
+        self.productive = frozenset(names[i] for i in range(n) if productive[i])
+        self.reachable = frozenset(names[i] for i in range(n) if reachable[i])
+        self.first = {names[i]: _names(first[i], terminal_names) for i in range(n)}
+        self.follow = {names[i]: _names(follow[i], terminal_names) for i in range(n)}
+
+    @staticmethod
+    def _propagate(masks, feeds):
+        # Worklist closure of masks along the feeds edges
+        work = deque(i for i in range(len(masks)) if masks[i])
+        queued = set(work)
+        while work:
+            source = work.popleft()
+            queued.discard(source)
+            for target in feeds[source]:
+                merged = masks[target] | masks[source]
+                if merged != masks[target]:
+                    masks[target] = merged
+                    if target not in queued:
+                        queued.add(target)
+                        work.append(target)
+
+    def first_of(self, symbols):
+        """FIRST of a sequence of symbol names (contains "ε" if it is nullable)."""
+        found = set()
+        for symbol in symbols:
+            if symbol not in self.first:
+                found.add(symbol)  # Terminal
+                return frozenset(found)
+            found |= self.first[symbol]
+            if symbol not in self.nullable:
+                return frozenset(found)
+        found.add("ε")
+        return frozenset(found)
+
+    @property
+    def useless(self):
+        """Non-terminals that are unreachable or derive no terminal string."""
+        return frozenset(self.nonterminals) - (self.productive & self.reachable)
+
+
+_cache = {}
+_CACHE_SIZE = 16
+
+
+def grammar_analysis(productions, start_symbol, symbols=()):
+    """
+    GrammarAnalysis of the productions, memoized on their content: callers
+    holding an unchanged grammar share one analysis (whatever symbols they
+    pass, if those split the bodies the same way), and any change to the
+    productions gives a fresh one.
+    """
+    symbols = _splitting_symbols(productions, symbols)
+    key = (productions_key(productions), start_symbol, symbols)
+    analysis = _cache.get(key)
+    if analysis is None:
+        if len(_cache) >= _CACHE_SIZE:
+            del _cache[next(iter(_cache))]  # Oldest entry
+        analysis = _cache[key] = GrammarAnalysis(productions, start_symbol, symbols)
+    return analysis
+
+
+def _splitting_symbols(productions, symbols):
+    # The part of symbols that changes how string bodies are split: names
+    # longer than one character that are not heads. Dropping the rest lets
+    # callers that pass VN | VT and callers that pass nothing share an analysis.
+    if not any(isinstance(body, str) for bodies in productions.values() for body in bodies):
+        return frozenset()
+    return frozenset(symbol for symbol in symbols if len(symbol) > 1 and symbol not in productions)
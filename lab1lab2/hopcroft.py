@@ -0,0 +1,112 @@
+from array import array
+from collections import deque
+
+from lab1lab2.compiled_automaton import DEAD, CompiledDFA
+
+
+def hopcroft_partition(n_states, n_symbols, successor, accepting):
+    """
+    Hopcroft's partition refinement on a complete DFA.
+    successor[s * n_symbols + c] is the next state of s on column c and
+    accepting[s] marks final states. Returns block_of: state -> block number.
+    """
+    # Predecessor lists per symbol: inverse[c][t] = states s with δ(s, c) = t
+    inverse = [[[] for _ in range(n_states)] for _ in range(n_symbols)]
+    for state in range(n_states):
+        for column in range(n_symbols):
+            inverse[column][successor[state * n_symbols + column]].append(state)
+
+    finals = {state for state in range(n_states) if accepting[state]}
+    others = set(range(n_states)) - finals
+    blocks = [block for block in (finals, others) if block]
+    block_of = [0] * n_states
+    for number, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = number
+
+    # Splitters (block, symbol); starting from the smaller block is enough
+    smallest = min(range(len(blocks)), key=lambda number: len(blocks[number]))
+    worklist = deque((smallest, column) for column in range(n_symbols))
+    pending = set(worklist)
+
+    while worklist:
+        splitter = worklist.popleft()
+        pending.discard(splitter)
+        block, column = splitter
+
+        # States that move into the splitter block on this symbol
+        predecessors = set()
+        for target in blocks[block]:
+            predecessors.update(inverse[column][target])
+
+        touched = {}
+        for state in predecessors:
+            touched.setdefault(block_of[state], []).append(state)
+
+        for number, inside in touched.items():
+            if len(inside) == len(blocks[number]):
+                continue  # The whole block moves into the splitter: no split
+
+            # Split: the states inside move to a new block
+            new_number = len(blocks)
+            inside = set(inside)
+            blocks[number] -= inside
+            blocks.append(inside)
+            for state in inside:
+                block_of[state] = new_number
+
+            for other_column in range(n_symbols):
+                if (number, other_column) in pending:
+                    pair = (new_number, other_column)
+                elif len(inside) <= len(blocks[number]):
+                    pair = (new_number, other_column)
+                else:
+                    pair = (number, other_column)
+                pending.add(pair)
+                worklist.append(pair)
+
+    return block_of
+
+
+def minimize_compiled(compiled):
+    """
+    Minimal DFA equivalent to a CompiledDFA. States that cannot lead to
+    acceptance are dropped, and the result is numbered breadth-first from the
+    start state in column order, so equivalent inputs give identical tables.
+    """
+    n, k = compiled.n_states, compiled.stride
+
+    # Complete the DFA with an explicit dead state n
+    successor = array("i", (n if target == DEAD else target for target in compiled.table))
+    successor.extend([n] * k)
+    accepting = bytearray(compiled.accepting) + b"\0"
+    block_of = hopcroft_partition(n + 1, k, successor, accepting)
+    dead_block = block_of[n]
+
+    # Canonical renumbering of the blocks reachable from the start block
+    representative = {}
+    for state in range(n + 1):
+        representative.setdefault(block_of[state], state)
+
+    start_block = block_of[compiled.start]
+    table = array("i")
+    if start_block == dead_block:  # Empty language: one rejecting state
+        table.extend([DEAD] * k)
+        return CompiledDFA(compiled.symbols, table, bytearray(1))
+
+    number = {start_block: 0}
+    order = [start_block]
+    for block in order:
+        state = representative[block]
+        for column in range(k):
+            target = block_of[successor[state * k + column]]
+            if target == dead_block:
+                table.append(DEAD)
+                continue
+            if target not in number:
+                number[target] = len(order)
+                order.append(target)
+            table.append(number[target])
+
+    final = bytearray(accepting[representative[block]] for block in order)
+    return CompiledDFA(compiled.symbols, table, final)
@@ -0,0 +1,104 @@
+import random
+
+from lab1lab2.compiled_automaton import DEAD
+
+
+class LanguageCounter:
+    """
+    Exact counts of accepted strings of a given length for a CompiledDFA,
+    and uniform sampling of such strings.
+
+    tables[L][q] is the number of strings of length L accepted from state q.
+    The tables only grow, so once length n is prepared every shorter length
+    is free and drawing a string costs O(n * |alphabet|).
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.tables = [[int(flag) for flag in compiled.accepting]]
+
+    def _extend(self, length):
+        compiled = self.compiled
+        table, stride = compiled.table, compiled.stride
+        n_states = compiled.n_states
+        while len(self.tables) <= length:
+            previous = self.tables[-1]
+            row = [0] * n_states
+            for state in range(n_states):
+                total = 0
+                for target in table[state * stride:(state + 1) * stride]:
+                    if target != DEAD:
+                        total += previous[target]
+                row[state] = total
+            self.tables.append(row)
+
+    def _count_by_matrix(self, length):
+        # e_start * M**length * f with M[i][j] = number of symbols from i to j
+        compiled = self.compiled
+        n_states, stride = compiled.n_states, compiled.stride
+        matrix = [[0] * n_states for _ in range(n_states)]
+        for state in range(n_states):
+            for target in compiled.table[state * stride:(state + 1) * stride]:
+                if target != DEAD:
+                    matrix[state][target] += 1
+
+        vector = [0] * n_states  # Row vector e_start * M**(bits consumed so far)
+        vector[compiled.start] = 1
+        while length:
+            if length & 1:
+                vector = [
+                    sum(vector[i] * matrix[i][j] for i in range(n_states) if vector[i])
+                    for j in range(n_states)
+                ]
+            length >>= 1
+            if length:
+                matrix = _square(matrix)
+        return sum(count for count, flag in zip(vector, compiled.accepting) if flag)
+
+    def count(self, length):
+        """Number of accepted strings of exactly this length (exact big int)."""
+        n_states = self.compiled.n_states
+        # Repeated squaring costs about n^3 log(length), the table DP n * length
+        if length >= len(self.tables) and n_states ** 2 * max(length.bit_length(), 1) < length:
+            return self._count_by_matrix(length)
+        self._extend(length)
+        return self.tables[length][self.compiled.start]
+
+    def sample(self, length, rng=random):
+        """
+        One accepted string of this length drawn uniformly at random, or None
+        if there is none.
+        """
+        self._extend(length)
+        compiled = self.compiled
+        table, stride, symbols = compiled.table, compiled.stride, compiled.symbols
+        tables = self.tables
+        state = compiled.start
+        if not tables[length][state]:
+            return None
+
+        output = []
+        for remaining in range(length, 0, -1):
+            # Pick the next symbol with probability proportional to its completions
+            pick = rng.randrange(tables[remaining][state])
+            counts = tables[remaining - 1]
+            base = state * stride
+            for column in range(stride):
+                target = table[base + column]
+                if target == DEAD:
+                    continue
+                if pick < counts[target]:
+                    output.append(symbols[column])
+                    state = target
+                    break
+                pick -= counts[target]
+        return "".join(output)
+
+
+def _square(matrix):
+    size = len(matrix)
+    columns = list(zip(*matrix))
+    return [
+        [sum(a * b for a, b in zip(row, columns[j]) if a) for j in range(size)]
+        for row in matrix
+    ]
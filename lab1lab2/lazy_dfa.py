@@ -0,0 +1,116 @@
+from collections import OrderedDict
+
+
+class LazyDFA:
+    """
+    On-the-fly subset construction over a BitsetNFA (in the style of RE2).
+
+    DFA states (bitmasks of NFA states) and their transitions are created only
+    when the input reaches them and memoized in a cache of at most cache_size
+    states. When the cache is full it either drops the least recently used
+    state (eviction="lru") or is cleared completely (eviction="flush").
+    If a single match keeps losing states faster than it reuses them, the
+    rest of that input is matched by plain NFA simulation instead.
+    """
+
+    def __init__(self, nfa, alphabet, cache_size=4096, eviction="lru", thrash_ratio=0.5):
+        if eviction not in ("lru", "flush"):
+            raise ValueError(f"Unknown eviction policy: {eviction!r}")
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+
+        self.nfa = nfa
+        self.alphabet = alphabet
+        self.cache_size = cache_size
+        self.eviction = eviction
+        self.thrash_ratio = thrash_ratio  # Misses per step that count as thrashing
+        self.cache = OrderedDict()  # state mask -> {symbol: next state mask}
+
+        # Counters for tuning cache_size
+        self.hits = 0        # transitions served from the cache
+        self.misses = 0      # transitions computed from the NFA
+        self.flushes = 0     # full cache clears ("flush" policy)
+        self.evictions = 0   # single states dropped ("lru" policy)
+        self.fallbacks = 0   # matches finished by NFA simulation
+
+    def _row(self, mask):
+        # Transition row of a DFA state, adding the state to the cache if needed
+        row = self.cache.get(mask)
+        if row is not None:
+            if self.eviction == "lru":
+                self.cache.move_to_end(mask)
+            return row, 0
+
+        lost = 0
+        if len(self.cache) >= self.cache_size:
+            if self.eviction == "lru":
+                self.cache.popitem(last=False)
+                self.evictions += 1
+                lost = 1
+            else:
+                lost = len(self.cache)
+                self.cache.clear()
+                self.flushes += 1
+        row = self.cache[mask] = {}
+        return row, lost
+
+    def match(self, input_string):
+        """Same answer as FiniteAutomaton.stringBelongToLanguage."""
+        nfa = self.nfa
+        alphabet = self.alphabet
+        mask = nfa.start
+        row, lost = self._row(mask)
+        misses = steps = 0
+
+        for position, char in enumerate(input_string):
+            if char not in alphabet:
+                return False
+
+            next_mask = row.get(char)
+            if next_mask is None:
+                next_mask = row[char] = nfa.step(mask, char)
+                self.misses += 1
+                misses += 1
+            else:
+                self.hits += 1
+
+            if not next_mask:
+                return False
+            mask = next_mask
+            steps += 1
+
+            row, dropped = self._row(mask)
+            lost += dropped
+            if lost >= self.cache_size and misses > self.thrash_ratio * steps:
+                # The cache is thrashing: finish this input without it
+                self.fallbacks += 1
+                return self._simulate(mask, input_string, position + 1)
+
+        return nfa.is_accepting(mask)
+
+    def _simulate(self, mask, input_string, position):
+        nfa = self.nfa
+        for index in range(position, len(input_string)):
+            char = input_string[index]
+            if char not in self.alphabet:
+                return False
+            mask = nfa.step(mask, char)
+            if not mask:
+                return False
+        return nfa.is_accepting(mask)
+
+    def stats(self):
+        """Cache counters: hits, misses, flushes, evictions, fallbacks and size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "evictions": self.evictions,
+            "fallbacks": self.fallbacks,
+            "states": len(self.cache),
+        }
+
+    def clear(self):
+        """Empties the cache and resets the counters."""
+        self.cache.clear()
+        self.hits = self.misses = self.flushes = self.evictions = self.fallbacks = 0
@@ -0,0 +1,61 @@
+import os
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, shared_memory
+
+from lab1lab2.compiled_automaton import CompiledDFA
+
+_worker_dfa = None  # CompiledDFA over the shared table, one per worker process
+_worker_memory = None
+
+
+def _init_worker(name, symbols, n_states, start):
+    global _worker_dfa, _worker_memory
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not take ownership: the parent unlinks the segment when matching ends
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    table_size = 4 * n_states * len(symbols)
+    table = _worker_memory.buf[:table_size].cast("i")
+    accepting = _worker_memory.buf[table_size:table_size + n_states]
+    _worker_dfa = CompiledDFA(symbols, table, accepting, start=start)
+
+
+def _match_chunk(strings):
+    match = _worker_dfa.match
+    return bytes(match(s) for s in strings)  # One byte per string keeps the reply small
+
+
+def match_corpus(compiled, strings, workers=None, chunk_size=10000, in_flight=None):
+    """
+    Matches an iterable of strings against a CompiledDFA on a process pool and
+    yields one bool per string, in input order.
+
+    The transition table is copied once into multiprocessing.shared_memory and
+    every worker maps it at start-up; only the string chunks and the result
+    bytes travel between processes. At most in_flight chunks (default: four
+    per worker) are queued at a time, so the input can be a lazy stream.
+    """
+    table_size = 4 * compiled.n_states * compiled.stride
+    memory = shared_memory.SharedMemory(create=True, size=max(table_size + compiled.n_states, 1))
+    try:
+        memory.buf[:table_size] = memoryview(compiled.table).cast("B")
+        memory.buf[table_size:table_size + compiled.n_states] = bytes(compiled.accepting)
+
+        initargs = (memory.name, compiled.symbols, compiled.n_states, compiled.start)
+        with Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            limit = in_flight or 4 * (workers or os.cpu_count() or 1)
+            iterator = iter(strings)
+            pending = deque()
+            while True:
+                while len(pending) < limit:
+                    chunk = list(islice(iterator, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.apply_async(_match_chunk, (chunk,)))
+                if not pending:
+                    break
+                for flag in pending.popleft().get():
+                    yield bool(flag)
+    finally:
+        memory.close()
+        memory.unlink()
@@ -0,0 +1,120 @@
+from collections import deque
+
+from lab1lab2.bitset_nfa import EPSILON
+from lab1lab2.compiled_automaton import compile_transitions
+
+# mode -> (is the pair accepting, can the pair still reach acceptance), both
+# computed from the acceptance / liveness of the two component states
+MODES = {
+    "intersection": (lambda a, b: a and b, lambda a, b: a and b),
+    "union": (lambda a, b: a or b, lambda a, b: a or b),
+    "difference": (lambda a, b: a and not b, lambda a, b: a),
+    "symmetric_difference": (lambda a, b: a != b, lambda a, b: a or b),
+}
+
+
+class DeterministicView:
+    """
+    Deterministic face of a FiniteAutomaton: a CompiledDFA for DFAs, or the
+    BitsetNFA for NFAs (its states are subsets, built on demand). Symbols
+    outside the automaton's alphabet lead to the dead state.
+    """
+
+    def __init__(self, engine, alphabet):
+        self.engine = engine
+        self.alphabet = set(alphabet) - {EPSILON}
+        self.start = engine.start
+        self.dead = engine.dead
+
+    def step(self, state, symbol):
+        if symbol not in self.alphabet:
+            return self.dead
+        return self.engine.step(state, symbol)
+
+    def is_accepting(self, state):
+        return self.engine.is_accepting(state)
+
+
+class ProductAutomaton:
+    """
+    Lazy product of two DeterministicViews. States are (left, right) pairs
+    and are only created when a match or compile() reaches them.
+    """
+
+    def __init__(self, left, right, mode="intersection"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown product mode: {mode!r}")
+        self.left = left
+        self.right = right
+        self.mode = mode
+        self._accepts, self._alive = MODES[mode]
+        self.symbols = sorted(left.alphabet | right.alphabet)
+        self.start = (left.start, right.start)
+
+    def _is_alive(self, pair):
+        left, right = pair
+        return self._alive(left != self.left.dead, right != self.right.dead)
+
+    def step(self, pair, symbol):
+        """Next pair, or None when the pair can no longer accept anything."""
+        next_pair = (self.left.step(pair[0], symbol), self.right.step(pair[1], symbol))
+        return next_pair if self._is_alive(next_pair) else None
+
+    def is_accepting(self, pair):
+        return self._accepts(self.left.is_accepting(pair[0]), self.right.is_accepting(pair[1]))
+
+    def match(self, input_string):
+        pair = self.start
+        if not self._is_alive(pair):
+            return False
+        for char in input_string:
+            pair = self.step(pair, char)
+            if pair is None:
+                return False
+        return self.is_accepting(pair)
+
+    def compile(self):
+        """CompiledDFA over the pairs reachable from the start pair."""
+        return compile_transitions(self.start, self.symbols, self.step, self.is_accepting)
+
+
+def find_counterexample(left, right):
+    """
+    Hopcroft-Karp equivalence check of two DeterministicViews. Pairs of states
+    are merged with union-find as they are explored breadth-first; the first
+    pair that disagrees on acceptance gives a string accepted by exactly one
+    side, which is returned. Returns None if the languages are equal.
+    """
+    symbols = sorted(left.alphabet | right.alphabet)
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node != root:  # Path compression
+            parent[node], node = root, parent.get(node, node)
+        return root
+
+    start = (left.start, right.start)
+    parent[(0, left.start)] = (1, right.start)
+    paths = [(None, None)]  # pair number -> (previous pair number, symbol)
+    queue = deque([(start, 0)])
+
+    while queue:
+        (a, b), number = queue.popleft()
+        if left.is_accepting(a) != right.is_accepting(b):
+            word = []
+            while number:
+                number, symbol = paths[number]
+                word.append(symbol)
+            return "".join(reversed(word))
+
+        for symbol in symbols:
+            next_a, next_b = left.step(a, symbol), right.step(b, symbol)
+            root_a, root_b = find((0, next_a)), find((1, next_b))
+            if root_a != root_b:
+                parent[root_a] = root_b
+                paths.append((number, symbol))
+                queue.append(((next_a, next_b), len(paths) - 1))
+    return None
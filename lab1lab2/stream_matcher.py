@@ -0,0 +1,115 @@
+from lab1lab2.bitset_nfa import BitsetNFA
+from lab1lab2.compiled_automaton import DEAD
+
+
+class StreamMatcher:
+    """
+    Resumable matcher that reads its input in pieces.
+
+    feed() accepts str chunks, or bytes-like chunks (bytes, bytearray,
+    memoryview, including views into an mmap) whose bytes are read as
+    Latin-1 characters. Chunks are processed in place, never concatenated.
+    As soon as no state is left, feed() returns False so the caller can stop
+    reading. The engine is a CompiledDFA or a BitsetNFA.
+    """
+
+    def __init__(self, engine, alphabet):
+        self.engine = engine
+        self.is_nfa = isinstance(engine, BitsetNFA)
+        if self.is_nfa:
+            self._symbols = {symbol: symbol for symbol in alphabet}
+            self._byte_symbols = {
+                ord(symbol): symbol for symbol in alphabet if len(symbol) == 1 and ord(symbol) < 256
+            }
+        else:
+            self._symbols = engine.columns
+            self._byte_symbols = {
+                ord(symbol): column for symbol, column in engine.columns.items()
+                if len(symbol) == 1 and ord(symbol) < 256
+            }
+        self.reset()
+
+    def reset(self):
+        """Starts over from the start state."""
+        self.state = self.engine.start
+        self.consumed = 0       # characters/bytes read so far
+        self.rejected = False   # no state left: the input can no longer match
+        self.finished = False
+
+    def feed(self, chunk):
+        """Consumes one chunk; returns False once the input is rejected."""
+        if self.finished:
+            raise ValueError("feed() called after finish()")
+        if self.rejected:
+            return False
+
+        if isinstance(chunk, str):
+            symbols = self._symbols
+        else:
+            chunk = memoryview(chunk)
+            if chunk.format != "B" or chunk.ndim != 1:
+                chunk = chunk.cast("B")
+            symbols = self._byte_symbols
+
+        if self.is_nfa:
+            self._feed_nfa(chunk, symbols)
+        else:
+            self._feed_dfa(chunk, symbols)
+        return not self.rejected
+
+    def _feed_dfa(self, chunk, columns):
+        table = self.engine.table
+        stride = self.engine.stride
+        state = self.state
+        count = 0
+        for item in chunk:
+            column = columns.get(item)
+            state = DEAD if column is None else table[state * stride + column]
+            count += 1
+            if state < 0:
+                self.rejected = True
+                break
+        self.state = state
+        self.consumed += count
+
+    def _feed_nfa(self, chunk, symbols):
+        nfa = self.engine
+        mask = self.state
+        count = 0
+        for item in chunk:
+            symbol = symbols.get(item)
+            mask = 0 if symbol is None else nfa.step(mask, symbol)
+            count += 1
+            if not mask:
+                self.rejected = True
+                break
+        self.state = mask
+        self.consumed += count
+
+    def feed_stream(self, stream, chunk_size=1 << 20):
+        """
+        Feeds a binary file object chunk by chunk through one reused buffer,
+        stopping early on rejection. Returns False if the input was rejected.
+        """
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while not self.rejected:
+            size = stream.readinto(buffer)
+            if not size:
+                break
+            self.feed(view[:size])
+        return not self.rejected
+
+    def finish(self):
+        """Ends the input; True if everything fed so far is accepted."""
+        self.finished = True
+        if self.rejected:
+            return False
+        return bool(self.engine.is_accepting(self.state))
+
+    def checkpoint(self):
+        """Plain tuple that restore() can resume from (picklable)."""
+        return (self.state, self.consumed, self.rejected, self.finished)
+
+    def restore(self, checkpoint):
+        self.state, self.consumed, self.rejected, self.finished = checkpoint
@@ -0,0 +1,126 @@
+"""
+Equivalence tests of the FiniteAutomaton engines on seeded random NFAs: every
+engine and construction must agree with the set-based simulation.
+
+Run from the repository root:
+    python -m pytest lab1lab2
+"""
+import itertools
+import random
+import unittest
+
+from lab1lab2.benchmarks import random_nfa
+from lab1lab2.finite_automaton import FiniteAutomaton
+
+SEEDS = range(40)
+
+
+def sample_nfa(seed):
+    # Small NFAs, a third of them with ε-transitions
+    rng = random.Random(seed)
+    return random_nfa(rng.randint(1, 7), rng.randint(1, 3), rng.uniform(0.3, 1.5), seed,
+                      epsilon_density=0.5 if seed % 3 == 0 else 0.0)
+
+
+def sample_strings(fa, seed, max_length=5, n_random=30):
+    """Every string up to max_length, random longer ones and one with a foreign symbol."""
+    symbols = sorted(fa.Sigma)
+    strings = ["".join(word) for length in range(max_length + 1)
+               for word in itertools.product(symbols, repeat=length)]
+    rng = random.Random(seed)
+    strings += ["".join(rng.choice(symbols) for _ in range(rng.randint(6, 40))) for _ in range(n_random)]
+    strings.append(symbols[0] + "#")
+    return strings
+
+
+class EngineEquivalenceTest(unittest.TestCase):
+    def test_engines_match_sets(self):
+        for seed in SEEDS:
+            fa = sample_nfa(seed)
+            for string in sample_strings(fa, seed):
+                expected = fa.stringBelongToLanguage(string, engine="sets")
+                for engine in ("auto", "bitset", "lazy"):
+                    with self.subTest(seed=seed, string=string, engine=engine):
+                        self.assertEqual(fa.stringBelongToLanguage(string, engine=engine), expected)
+
+    def test_small_lazy_cache_matches_sets(self):
+        for seed in SEEDS:
+            fa = sample_nfa(seed)
+            lazy = fa.lazy_dfa(cache_size=2)
+            for string in sample_strings(fa, seed):
+                with self.subTest(seed=seed, string=string):
+                    self.assertEqual(lazy.match(string), fa.stringBelongToLanguage(string, engine="sets"))
+
+    def test_subset_construction(self):
+        for seed in SEEDS:
+            fa = sample_nfa(seed)
+            dfa = fa.convert_ndfa_to_dfa()
+            self.assertTrue(dfa.is_deterministic())
+            for string in sample_strings(fa, seed):
+                with self.subTest(seed=seed, string=string):
+                    self.assertEqual(dfa.stringBelongToLanguage(string, engine="table"),
+                                     fa.stringBelongToLanguage(string, engine="sets"))
+
+    def test_minimize(self):
+        for seed in SEEDS:
+            fa = sample_nfa(seed)
+            dfa = fa.convert_ndfa_to_dfa()
+            minimal = fa.minimize()
+            self.assertLessEqual(len(minimal.Q), len(dfa.Q))
+            self.assertEqual(dfa.minimize().delta, minimal.delta)  # Canonical numbering
+            for string in sample_strings(fa, seed):
+                with self.subTest(seed=seed, string=string):
+                    self.assertEqual(minimal.stringBelongToLanguage(string),
+                                     fa.stringBelongToLanguage(string, engine="sets"))
+
+    def test_match_many(self):
+        for seed in SEEDS:
+            fa = sample_nfa(seed)
+            strings = [string for string in sample_strings(fa, seed) if "#" not in string]
+            expected = [fa.stringBelongToLanguage(string, engine="sets") for string in strings]
+            self.assertEqual([bool(result) for result in fa.match_many(strings)], expected)
+
+    def test_match_many_lone_surrogate(self):
+        fa = sample_nfa(1)
+        symbol = sorted(fa.Sigma)[0]
+        strings = [symbol + "\ud800", "\udfff", symbol]
+        expected = [fa.stringBelongToLanguage(string) for string in strings]
+        self.assertEqual([bool(result) for result in fa.match_many(strings)], expected)
+
+    def test_products_and_equivalence(self):
+        for seed in SEEDS:
+            left, right = sample_nfa(seed), sample_nfa(seed + 1000)
+            if left.Sigma != right.Sigma:
+                continue
+            self.assertTrue(left.is_equivalent(left.convert_ndfa_to_dfa()))
+            intersection, union = left.intersection(right), left.union(right)
+            difference = left.difference(right)
+            for string in sample_strings(left, seed):
+                in_left = left.stringBelongToLanguage(string, engine="sets")
+                in_right = right.stringBelongToLanguage(string, engine="sets")
+                with self.subTest(seed=seed, string=string):
+                    self.assertEqual(intersection.stringBelongToLanguage(string), in_left and in_right)
+                    self.assertEqual(union.stringBelongToLanguage(string), in_left or in_right)
+                    self.assertEqual(difference.stringBelongToLanguage(string), in_left and not in_right)
+
+            counterexample = left.find_counterexample(right)
+            if counterexample is None:
+                self.assertTrue(left.is_equivalent(right))
+            else:
+                self.assertNotEqual(left.stringBelongToLanguage(counterexample, engine="sets"),
+                                    right.stringBelongToLanguage(counterexample, engine="sets"))
+
+    def test_invalidate_after_editing_delta(self):
+        fa = FiniteAutomaton({"a", "b", "x"}, {"0", "1"},
+                             {"a": {"0": {"a", "b"}}, "b": {"1": {"x"}}}, "a", {"x"})
+        self.assertTrue(fa.stringBelongToLanguage("01", engine="bitset"))
+        self.assertTrue(fa.convert_ndfa_to_dfa().stringBelongToLanguage("01"))
+        fa.delta["a"]["0"] = {"a"}
+        self.assertFalse(fa.convert_ndfa_to_dfa().stringBelongToLanguage("01"))
+        fa.invalidate()
+        for engine in ("sets", "bitset", "lazy"):
+            self.assertFalse(fa.stringBelongToLanguage("01", engine=engine))
+
+
+if __name__ == "__main__":
+    unittest.main()
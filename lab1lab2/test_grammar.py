@@ -0,0 +1,143 @@
+"""
+Tests of ExtendedGrammar's automaton and string counting against brute-force
+derivation of the grammar's language.
+
+Run from the repository root:
+    python -m pytest lab1lab2
+"""
+import itertools
+import unittest
+
+from lab1lab2.compact_grammar import CompactGrammar
+from lab1lab2.derivation import split_production
+from lab1lab2.grammar import ExtendedGrammar
+from lab1lab2.grammar_analysis import grammar_analysis
+
+
+def lab_grammar():
+    return ExtendedGrammar(
+        VN={"S", "A", "B"},
+        VT={"a", "b"},
+        P={"S": ["aA", "bB"], "A": ["a", "aS"], "B": ["b", "bB"]},
+        S="S",
+    )
+
+
+def derivable(grammar, max_length):
+    """Every terminal string of at most max_length symbols, by leftmost derivation."""
+    symbols = set(grammar.VN) | set(grammar.VT)
+    productions = {
+        head: [split_production(body, symbols) for body in bodies]
+        for head, bodies in grammar.P.items()
+    }
+    found = set()
+    seen = set()
+    stack = [(grammar.S,)]
+    while stack:
+        form = stack.pop()
+        if form in seen or sum(1 for symbol in form if symbol not in productions) > max_length:
+            continue
+        seen.add(form)
+        for i, symbol in enumerate(form):
+            if symbol in productions:
+                for body in productions[symbol]:
+                    stack.append(form[:i] + body + form[i + 1:])
+                break
+        else:
+            found.add(form)
+    return found
+
+
+class GrammarLanguageTest(unittest.TestCase):
+    GRAMMARS = {
+        "lab": lab_grammar,
+        "multi-terminal": lambda: ExtendedGrammar(
+            VN={"S", "A"}, VT={"a", "b", "c"},
+            P={"S": ["abS", "cA", "ε"], "A": ["b", "bS", "A"]}, S="S"),
+        "unit": lambda: ExtendedGrammar(
+            VN={"S", "A", "B"}, VT={"a", "b"},
+            P={"S": ["A", "bB"], "A": ["a", "aB"], "B": ["b", "S"]}, S="S"),
+    }
+
+    def test_automaton_matches_derivations(self):
+        for name, build in self.GRAMMARS.items():
+            grammar = build()
+            fa = grammar.toFiniteAutomaton()
+            language = derivable(grammar, 6)
+            for length in range(7):
+                for word in itertools.product(sorted(grammar.VT), repeat=length):
+                    with self.subTest(grammar=name, word="".join(word)):
+                        self.assertEqual(fa.stringBelongToLanguage(word), word in language)
+
+    def test_count_and_enumerate(self):
+        for name, build in self.GRAMMARS.items():
+            grammar = build()
+            language = derivable(grammar, 6)
+            for length in range(7):
+                with self.subTest(grammar=name, length=length):
+                    self.assertEqual(grammar.count_strings(length),
+                                     sum(1 for word in language if len(word) == length))
+            expected = sorted(("".join(word) for word in language), key=lambda word: (len(word), word))
+            self.assertEqual(list(grammar.enumerate_strings(6)), expected)
+
+    def test_lab_grammar_strings(self):
+        grammar = lab_grammar()
+        self.assertEqual(grammar.count_strings(1), 0)
+        self.assertEqual(list(grammar.enumerate_strings(4)), ["aa", "bb", "bbb", "aaaa", "aabb", "bbbb"])
+        language = {"".join(word) for word in derivable(grammar, 8)}
+        for sample in grammar.sample_strings(8, count=50, seed=1):
+            self.assertIn(sample, language)
+
+    def test_classification(self):
+        cases = [
+            (lab_grammar(), "Type 3"),
+            (ExtendedGrammar({"S", "A"}, {"a"}, {"S": ["A"], "A": ["a"]}, "S"), "Type 2"),
+            (ExtendedGrammar({"S"}, {"a", "+"}, {"S": ["+S", "a"]}, "S"), "Type 2"),
+            (ExtendedGrammar({"S", "A"}, {"a", "b"}, {"S": ["aA"], "SA": ["b"], "AS": ["ab"]}, "S"), "Type 3"),
+            (ExtendedGrammar({"S"}, {"a", "b"}, {"S": ["aSb", "ab"]}, "S"), "Type 2"),
+            (ExtendedGrammar({"S", "A"}, {"a"}, {"S": ["aA"], "aA": ["A"]}, "S"), "Type 0"),
+        ]
+        for grammar, expected in cases:
+            with self.subTest(productions=grammar.P):
+                self.assertTrue(grammar.classify_chomsky_hierarchy().startswith(expected))
+
+    def test_cache_follows_the_grammar(self):
+        grammar = lab_grammar()
+        self.assertEqual(grammar.count_strings(1), 0)
+        grammar.S = "A"
+        self.assertEqual(grammar.count_strings(1), 1)
+        grammar.P["A"].append("aA")
+        grammar.P["A"].append("bA")
+        self.assertTrue(grammar.classify_chomsky_hierarchy().startswith("Type 3"))
+        grammar.VT = grammar.VT | {"c"}
+        grammar.P["A"].append("cA")
+        self.assertEqual(set(grammar.enumerate_strings(2, min_length=2)), {"aa", "ba", "ca"})
+
+    def test_one_analysis_for_classifying_and_parsing(self):
+        # EarleyParser asks for the analysis without VN | VT
+        grammar = lab_grammar()
+        self.assertIs(grammar_analysis(grammar.P, grammar.S), grammar.analysis())
+
+    def test_compact_keeps_symbol_boundaries(self):
+        productions = {"S": [["a", "b", "S"], ["ab"], ["ε"]], "SS": [["S", "S"]], "A": ["aA", "Ab"]}
+        compact = CompactGrammar.from_productions(productions)
+        strings = compact.to_productions(as_strings=True)
+        self.assertEqual(CompactGrammar.from_productions(strings).to_productions(), compact.to_productions())
+
+        grammar = ExtendedGrammar.from_compact(
+            CompactGrammar.from_productions({"S": productions["S"]}), "S")
+        self.assertEqual(grammar.P["S"], [("a", "b", "S"), ("ab",), ("ε",)])
+        fa = grammar.toFiniteAutomaton()
+        self.assertTrue(fa.stringBelongToLanguage(("a", "b", "ab")))
+        self.assertTrue(fa.stringBelongToLanguage(()))
+        self.assertFalse(fa.stringBelongToLanguage(("ab", "ab")))
+        self.assertFalse(fa.stringBelongToLanguage(("a",)))
+
+    def test_not_right_linear(self):
+        grammar = ExtendedGrammar({"S"}, {"a", "b"}, {"S": ["aSb", "ε"]}, "S")
+        with self.assertRaises(ValueError):
+            grammar.toFiniteAutomaton()
+
+
+if __name__ == "__main__":
+    unittest.main()
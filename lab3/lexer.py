@@ -1,4 +1,333 @@
-from tokens import TokenType, Token
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import filterfalse
+
+from tokens import CONSTANT_VALUES, TokenType, Token, TokenBuffer
+
+
+def _letter_class():
+    # Regex class of the str.isalpha() characters. [^\W\d_] alone would also
+    # take numerals such as ½, ² and Ⅷ (alphanumeric, but neither letters
+    # nor decimal digits), so those are found once and excluded as ranges.
+    every = array("I", range(sys.maxunicode + 1)).tobytes().decode("utf-32-le", "surrogatepass")
+    ranges = []
+    for char in filterfalse(str.isalpha, re.sub(r"[\W\d_]+", "", every)):
+        if ranges and ord(ranges[-1][1]) + 1 == ord(char):
+            ranges[-1][1] = char
+        else:
+            ranges.append([char, char])
+    excluded = "".join(re.escape(low) if low == high else f"{re.escape(low)}-{re.escape(high)}"
+                       for low, high in ranges)
+    return rf"[^\W\d_{excluded}]"
+
+
+_LETTERS = _letter_class()
+
+# Master regex: leading whitespace, then one group per token class. Only the
+# group that matched is non-empty, so no per-character branching is needed.
+_SCANNER = re.compile(
+    r"(\s*)(?:"
+    r"(?P<number>\d+\.?\d*|\.\d+)"   # 12, 1.5, 5., .5 (one decimal point)
+    rf"|(?P<name>{_LETTERS}+)"       # Runs of letters: functions & constants
+    r"|(?P<other>\S))"               # Operators, parentheses or invalid
+)
+# The same pattern without groups: findall() then returns each lexeme with
+# its leading whitespace as one string, so equal lexemes are classified once.
+_LEXEME = re.compile(rf"\s*(?:\d+\.?\d*|\.\d+|{_LETTERS}+|\S)")
+_LEXEME_CACHE_SIZE = 4096  # Per call; input full of distinct numbers stops filling it
+
+_OPERATORS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MULTIPLY,
+    "/": TokenType.DIVIDE,
+    "%": TokenType.MODULO,
+    "^": TokenType.EXPONENT,
+    "!": TokenType.FACTORIAL,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+}
+
+# Lower-cased name -> (type, value); built once instead of on every identifier
+_KEYWORDS = {
+    "sin": (TokenType.SIN, "sin"),
+    "cos": (TokenType.COS, "cos"),
+    "tan": (TokenType.TAN, "tan"),
+    "log": (TokenType.LOG, "log"),
+    "sqrt": (TokenType.SQRT, "sqrt"),
+    "exp": (TokenType.EXP, "exp"),
+    "abs": (TokenType.ABS, "abs"),
+    "pow": (TokenType.POW, "pow"),
+    "pi": (TokenType.PI, CONSTANT_VALUES[TokenType.PI]),
+    "e": (TokenType.E, CONSTANT_VALUES[TokenType.E]),
+}
+
+# The same scanner for bytes-like input (bytes, memoryview, mmap), read as
+# UTF-8. ASCII tokens are matched directly; whitespace is every ASCII
+# character str.isspace() accepts. A number or name must not run into a
+# byte >= 0x80 ((?=(...))\N matches like an atomic group, so it cannot
+# backtrack to a shorter token instead). Otherwise the whole run up to the
+# next ASCII whitespace is taken as one "wide" match, decoded and lexed by
+# _SCANNER (see _lex_wide), so bytes give the tokens str input gives.
+_BYTES_SCANNER = re.compile(
+    rb"([\t\n\x0b\x0c\r\x1c-\x1f ]*)(?:"
+    rb"(?=(\d+\.?\d*|\.\d+))\2(?![\x80-\xff])"
+    rb"|(?=([A-Za-z]+))\3(?![\x80-\xff])"
+    rb"|(?!\.[\d\x80-\xff])([^\t\n\x0b\x0c\r\x1c-\x1f 0-9A-Za-z\x80-\xff])"
+    rb"|([^\t\n\x0b\x0c\r\x1c-\x1f ]+))"
+)
+_NUMBER, _NAME, _OTHER, _WIDE = 2, 3, 4, 5
+_BYTE_OPERATORS = {symbol.encode(): type_ for symbol, type_ in _OPERATORS.items()}
+_BYTE_KEYWORDS = {name.encode(): keyword for name, keyword in _KEYWORDS.items()}
+
+
+def _make_token(space, number, name, other):
+    """Token for one _SCANNER match (exactly one of the groups is non-empty)."""
+    if other:
+        return Token(_OPERATORS.get(other, TokenType.INVALID), other)
+    if number:
+        if "." in number:
+            return Token(TokenType.FLOAT, float(number))
+        return Token(TokenType.INTEGER, int(number))
+    keyword = _KEYWORDS.get(name.lower())
+    if keyword is None:
+        return Token(TokenType.INVALID, name)
+    return Token(*keyword)
+
+
+def _split_lexeme(lexeme):
+    """
+    _SCANNER's groups for one _LEXEME match, without matching it again:
+    str.lstrip() strips exactly what \\s matches, and the first character
+    of the rest tells its class.
+    """
+    token = lexeme.lstrip()
+    space = lexeme[:len(lexeme) - len(token)]
+    first = token[0]
+    if first.isdecimal() or (first == "." and len(token) > 1):
+        return space, token, "", ""
+    if first.isalpha():
+        return space, "", token, ""
+    return space, "", "", token
+
+
+def _make_byte_token(space, number, name, other, wide=b""):
+    """_make_token for a _BYTES_SCANNER match that is not wide (see _lex_wide)."""
+    if other:
+        return Token(_BYTE_OPERATORS.get(other, TokenType.INVALID), other.decode("utf-8", "replace"))
+    if number:
+        if b"." in number:
+            return Token(TokenType.FLOAT, float(number))
+        return Token(TokenType.INTEGER, int(number))
+    keyword = _BYTE_KEYWORDS.get(name.lower())
+    if keyword is None:
+        return Token(TokenType.INVALID, name.decode("utf-8", "replace"))
+    return Token(*keyword)
+
+
+def _lex_wide(run, offset):
+    """
+    Yields (Token, start, end) for a run of non-whitespace bytes at offset
+    that contains non-ASCII bytes. Tokens never span whitespace, so the run
+    is lexed on its own, as str; invalid UTF-8 bytes end up in INVALID tokens.
+    """
+    run = bytes(run)
+    text = run.decode("utf-8", "surrogateescape")  # Encodes back to the same bytes
+    char = byte = 0
+    for match in _SCANNER.finditer(text):
+        kind = match.lastindex
+        start, end = match.span(kind)
+        start_byte = byte + len(text[char:start].encode("utf-8", "surrogateescape"))
+        byte = start_byte + len(text[start:end].encode("utf-8", "surrogateescape"))
+        char = end
+        token = _make_token(*match.groups())
+        if token.type == TokenType.INVALID:  # As _span_token decodes it
+            token = Token(token.type, run[start_byte:byte].decode("utf-8", "replace"))
+        yield token, offset + start_byte, offset + byte
+
+
+def _str_tokens(text, pos=0):
+    # (Token, start, end) for every token of a str from pos on
+    for match in _SCANNER.finditer(text, pos):
+        kind = match.lastindex
+        start, end = match.span(kind)
+        yield _make_token(*match.groups()), start, end
+
+
+def _byte_tokens(data, pos=0):
+    # (Token, start, end) for every token of a bytes-like buffer from pos on
+    for match in _BYTES_SCANNER.finditer(data, pos):
+        kind = match.lastindex
+        start, end = match.span(kind)
+        if kind == _WIDE:
+            yield from _lex_wide(match.group(kind), start)
+        else:
+            yield _make_byte_token(*match.groups()), start, end
+
+
+def scan_spans(data, pos=0):
+    """
+    Yields (type, start, end) for every token of a bytes-like buffer from
+    pos on, ending with EOF. Only runs with non-ASCII bytes are decoded; the
+    buffer (e.g. an mmap of a huge file) is read in place.
+    """
+    operators, keywords = _BYTE_OPERATORS, _BYTE_KEYWORDS
+    for match in _BYTES_SCANNER.finditer(data, pos):
+        kind = match.lastindex
+        lexeme = match.group(kind)
+        if kind == _WIDE:
+            for token, start, end in _lex_wide(lexeme, match.start(kind)):
+                yield token.type, start, end
+            continue
+        if kind == _OTHER:
+            type_ = operators.get(lexeme, TokenType.INVALID)
+        elif kind == _NUMBER:
+            type_ = TokenType.FLOAT if b"." in lexeme else TokenType.INTEGER
+        else:
+            keyword = keywords.get(lexeme.lower())
+            type_ = TokenType.INVALID if keyword is None else keyword[0]
+        start, end = match.span(kind)
+        yield type_, start, end
+    yield TokenType.EOF, len(data), len(data)
+
+
+def _span_token(data, type_, start, end):
+    # Token for a span of a bytes-like buffer, decoding only this lexeme
+    if type_ == TokenType.EOF:
+        return Token(type_, None)
+    if type_ in CONSTANT_VALUES:
+        return Token(type_, CONSTANT_VALUES[type_])
+    text = bytes(data[start:end]).decode("utf-8", "replace")
+    if type_ == TokenType.INTEGER:
+        return Token(type_, int(text))  # Also non-ASCII digits, as in str input
+    if type_ == TokenType.FLOAT:
+        return Token(type_, float(text))
+    return Token(type_, text if type_ == TokenType.INVALID else text.lower())  # Functions: lower case
+
+
+def tokenize(text, pos=0):
+    """
+    Yields the tokens of text from pos on, ending with an EOF token. text
+    may also be bytes, a memoryview or an mmap (see scan_spans). Equal
+    lexemes share one Token object, so tokens must not be modified.
+    """
+    if not isinstance(text, str):
+        for type_, start, end in scan_spans(text, pos):
+            yield _span_token(text, type_, start, end)
+        return
+    cache = {}  # Lexeme -> its Token, so repeated lexemes cost one dict lookup
+    for lexeme in _LEXEME.findall(text, pos):
+        token = cache.get(lexeme)
+        if token is None:
+            token = _make_token(*_split_lexeme(lexeme))
+            if len(cache) < _LEXEME_CACHE_SIZE:
+                cache[lexeme] = token
+        yield token
+    yield Token(TokenType.EOF, None)
+
+
+def tokenize_compact(text, pos=0):
+    """
+    The tokens of text from pos on, ending with EOF, as a TokenBuffer
+    (types, offsets and numeric values in arrays, no Token objects). For
+    bytes-like text only the spans are stored; see scan_spans.
+    """
+    if not isinstance(text, str):
+        buffer = TokenBuffer(text, with_values=False)
+        types, starts, ends = buffer.types, buffer.starts, buffer.ends
+        for type_, start, end in scan_spans(text, pos):
+            types.append(type_)
+            starts.append(start)
+            ends.append(end)
+        return buffer
+
+    buffer = TokenBuffer(text)
+    types, starts, ends, values = buffer.types, buffer.starts, buffer.ends, buffer.values
+    cache = {}  # Lexeme -> (type, leading whitespace, value)
+    for lexeme in _LEXEME.findall(text, pos):
+        entry = cache.get(lexeme)
+        if entry is None:
+            space, number, name, other = _split_lexeme(lexeme)
+            if other:
+                entry = (_OPERATORS.get(other, TokenType.INVALID), len(space), 0.0)
+            elif number:
+                # value_at() re-reads huge ints from the text
+                entry = (TokenType.FLOAT if "." in number else TokenType.INTEGER, len(space), float(number))
+            else:
+                keyword = _KEYWORDS.get(name.lower())
+                # Constants are looked up by type
+                entry = (TokenType.INVALID if keyword is None else keyword[0], len(space), 0.0)
+            if len(cache) < _LEXEME_CACHE_SIZE:
+                cache[lexeme] = entry
+        type_, space, value = entry
+        types.append(type_)
+        starts.append(pos + space)
+        pos += len(lexeme)
+        ends.append(pos)
+        values.append(value)
+    buffer.append(TokenType.EOF, len(text), len(text))
+    return buffer
+
+
+def relex(buffer, offset, deleted, inserted):
+    """
+    Applies an edit (deleted characters at offset replaced by inserted) to
+    a TokenBuffer from tokenize_compact and its str or bytes source, in
+    place. Scanning restarts at the last token boundary before the edit and
+    stops once a new token starts where an old one did (shifted by the
+    edit): the scanner keeps no state, so the rest of the stream is the old
+    one. Returns (first, old_stop, new_stop): old tokens [first:old_stop]
+    became [first:new_stop]; the ones after them only moved.
+    """
+    source = buffer.source
+    if not isinstance(source, (str, bytes)):
+        raise TypeError("relex needs a str or bytes source")
+    if offset < 0 or deleted < 0 or offset + deleted > len(source):
+        raise ValueError(f"edit {offset}+{deleted} outside a text of length {len(source)}")
+    text = source[:offset] + inserted + source[offset + deleted:]
+    shift = len(inserted) - deleted
+    edit_end = offset + len(inserted)  # End of the inserted text in the new text
+    types, starts, ends, values = buffer.types, buffer.starts, buffer.ends, buffer.values
+
+    # A token looks one character past its end, so one ending before the
+    # edit is unchanged; the first that reaches it may grow, shrink or split
+    first = bisect_left(ends, offset)
+    restart = ends[first - 1] if first else 0
+    last = len(types) - 1  # Old EOF, which always lines up
+
+    tokens = _str_tokens(text, restart) if isinstance(text, str) else _byte_tokens(text, restart)
+    new_types, new_starts, new_ends, new_values = [], [], [], []
+    old_stop = last
+    for token, start, end in tokens:
+        if start >= edit_end:
+            old = bisect_left(starts, start - shift, first, last)
+            if old < last and starts[old] == start - shift:
+                old_stop = old
+                break
+        type_ = token.type
+        new_types.append(type_)
+        new_starts.append(start)
+        new_ends.append(end)
+        if type_ == TokenType.INTEGER or type_ == TokenType.FLOAT:
+            new_values.append(float(token.value))  # As in tokenize_compact
+        else:
+            new_values.append(0.0)
+
+    new_stop = first + len(new_types)
+    types[first:old_stop] = array("b", new_types)
+    if shift:
+        starts[first:] = array(starts.typecode, new_starts + [start + shift for start in starts[old_stop:]])
+        ends[first:] = array(ends.typecode, new_ends + [end + shift for end in ends[old_stop:]])
+    else:
+        starts[first:old_stop] = array(starts.typecode, new_starts)
+        ends[first:old_stop] = array(ends.typecode, new_ends)
+    if values is not None:
+        values[first:old_stop] = array("d", new_values)
+    buffer.source = text
+    return first, old_stop, new_stop
+
 
 class Lexer:
     def __init__(self, text):
@@ -16,107 +345,137 @@ class Lexer:
         return None
 
     def get_next_token(self):
-        """Tokenize the input string."""
-        while self.pos < len(self.text):
-            char = self.text[self.pos]
-
-            if char.isspace():  # Ignore whitespace
-                self.advance()
-                continue
-
-            if char.isdigit() or char == '.':  # Handle numbers
-                return self.number()
+        """Tokenize the input string (or bytes-like buffer)."""
+        if not isinstance(self.text, str):
+            type_, start, end = next(scan_spans(self.text, self.pos))
+            self.pos = end
+            return _span_token(self.text, type_, start, end)
+        match = _SCANNER.match(self.text, self.pos)
+        if match is None:  # Only whitespace left
+            self.pos = len(self.text)
+            return Token(TokenType.EOF, None)
+        self.pos = match.end()
+        return _make_token(*match.groups())
 
-            if char.isalpha():  # Handle functions & constants
-                return self.identifier()
+    def tokenize(self):
+        """
+        Yields the remaining tokens, ending with EOF (the stream repeated
+        get_next_token() calls give). The whole input counts as consumed.
+        """
+        pos, self.pos = self.pos, len(self.text)
+        return tokenize(self.text, pos)
 
-            if char == '+':
-                self.advance()
-                return Token(TokenType.PLUS, '+')
+    def tokenize_compact(self):
+        """Remaining tokens as a TokenBuffer; the whole input counts as consumed."""
+        pos, self.pos = self.pos, len(self.text)
+        return tokenize_compact(self.text, pos)
 
-            if char == '-':
-                self.advance()
-                return Token(TokenType.MINUS, '-')
+    def number(self):
+        """Recognizes integers and floating-point numbers."""
+        return self.get_next_token()
 
-            if char == '*':
-                self.advance()
-                return Token(TokenType.MULTIPLY, '*')
+    def identifier(self):
+        """Recognizes function names and constants."""
+        return self.get_next_token()
 
-            if char == '/':
-                self.advance()
-                return Token(TokenType.DIVIDE, '/')
 
-            if char == '%':
-                self.advance()
-                return Token(TokenType.MODULO, '%')
+class StreamLexer:
+    """
+    Lexer over a file-like object (text or binary), read chunk_size at a
+    time. Tokens are yielded as soon as they are complete; only a token
+    touching the end of a chunk, which may continue in the next one, is
+    carried over, so memory stays at about one chunk plus one token.
 
-            if char == '^':
-                self.advance()
-                return Token(TokenType.EXPONENT, '^')
+    line and column (1-based; counted in bytes for binary streams) are the
+    position of the last token yielded. Tokens never contain line breaks,
+    so they are updated from the whitespace between tokens only.
+    """
 
-            if char == '!':
-                self.advance()
-                return Token(TokenType.FACTORIAL, '!')
+    def __init__(self, stream, chunk_size=65536):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.line = 1
+        self.column = 1
+        # read1 returns whatever is available, so a live feed is not held up
+        self._read = getattr(stream, "read1", stream.read)
 
-            if char == '(':
-                self.advance()
-                return Token(TokenType.LPAREN, '(')
+    def __iter__(self):
+        """Yields every token of the stream, ending with EOF."""
+        for token in self._scan():
+            if token is not None:
+                yield token
 
-            if char == ')':
-                self.advance()
-                return Token(TokenType.RPAREN, ')')
+    def expressions(self):
+        """Yields the tokens of each non-empty line as a list ending with EOF, ready for a Parser."""
+        tokens = []
+        for token in self._scan():
+            if token is None or token.type == TokenType.EOF:  # End of a line or of the stream
+                if tokens:
+                    tokens.append(Token(TokenType.EOF, None))
+                    yield tokens
+                    tokens = []
+            else:
+                tokens.append(token)
 
-            self.advance()
-            return Token(TokenType.INVALID, char)
+    def _scan(self):
+        # Tokens, with None after every line break
+        text = self._read(self.chunk_size)
+        if isinstance(text, str):
+            scanner, make_token, newline = _SCANNER, _make_token, "\n"
+        else:
+            text = bytes(text)
+            scanner, make_token, newline = _BYTES_SCANNER, _make_byte_token, b"\n"
+        empty = text[:0]
+        base = 0        # Absolute offset of text[0]
+        line_start = 0  # Absolute offset of the first character of the current line
+        final = not text
 
-        return Token(TokenType.EOF, None)
+        while True:
+            matches = scanner.findall(text)
+            pos = 0
+            carried = None
+            for i, match in enumerate(matches):
+                space = match[0]
+                if space:
+                    if newline in space:
+                        self.line += space.count(newline)
+                        line_start = base + pos + space.rindex(newline) + 1
+                        yield None
+                    pos += len(space)
+                start = pos
+                pos += len(empty.join(match[1:]))  # Only one group is non-empty
+                if pos == len(text) and i == len(matches) - 1 and not final:
+                    carried = text[start:]  # May continue in the next chunk
+                    break
+                if len(match) > 4 and match[4]:  # Non-ASCII run of a binary stream
+                    for token, token_start, _end in _lex_wide(match[4], base + start):
+                        self.column = token_start - line_start + 1
+                        yield token
+                    continue
+                self.column = base + start - line_start + 1
+                yield make_token(*match)
 
-    def number(self):
-        """Recognizes integers and floating-point numbers."""
-        num_str = ""
-        is_float = False
+            if carried is None:
+                rest = text[pos:]  # Trailing whitespace only
+                if newline in rest:
+                    self.line += rest.count(newline)
+                    line_start = base + pos + rest.rindex(newline) + 1
+                    yield None
+                base += len(text)
+                text = empty
+            else:
+                base += len(text) - len(carried)
+                text = carried
 
-        while self.pos < len(self.text) and (self.text[self.pos].isdigit() or self.text[self.pos] == '.'):
-            if self.text[self.pos] == '.':
-                if is_float:  # Second decimal point is invalid
-                    break
-                is_float = True
-            num_str += self.text[self.pos]
-            self.advance()
+            if final:
+                self.column = base - line_start + 1
+                yield Token(TokenType.EOF, None)
+                return
+            chunk = self._read(self.chunk_size)
+            final = not chunk
+            text += chunk if isinstance(chunk, str) else bytes(chunk)
 
-        if is_float:
-            return Token(TokenType.FLOAT, float(num_str))
-        else:
-            return Token(TokenType.INTEGER, int(num_str))
 
-    def identifier(self):
-        """Recognizes function names and constants."""
-        ident = ""
-        while self.pos < len(self.text) and self.text[self.pos].isalpha():
-            ident += self.text[self.pos]
-            self.advance()
-
-        ident_lower = ident.lower()
-
-        function_map = {
-            "sin": TokenType.SIN,
-            "cos": TokenType.COS,
-            "tan": TokenType.TAN,
-            "log": TokenType.LOG,
-            "sqrt": TokenType.SQRT,
-            "exp": TokenType.EXP,
-            "abs": TokenType.ABS,
-            "pow": TokenType.POW,
-        }
-
-        constant_map = {
-            "pi": (TokenType.PI, 3.14159),
-            "e": (TokenType.E, 2.71828),
-        }
-
-        if ident_lower in function_map:
-            return Token(function_map[ident_lower], ident_lower)
-        elif ident_lower in constant_map:
-            return Token(constant_map[ident_lower][0], constant_map[ident_lower][1])
-        else:
-            return Token(TokenType.INVALID, ident)
+def tokenize_stream(stream, chunk_size=65536):
+    """Yields the tokens of a file-like object, ending with EOF (see StreamLexer)."""
+    return iter(StreamLexer(stream, chunk_size))
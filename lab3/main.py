@@ -1,18 +1,22 @@
-from lexer import Lexer
+import sys
 
-def test_lexer(input_text):
-    lexer = Lexer(input_text)
-    tokens = []
+from lexer import Lexer, StreamLexer
 
-    while True:
-        token = lexer.get_next_token()
-        tokens.append(token)
-        if token.type == "EOF":
-            break
-
-    return tokens
+def test_lexer(input_text, compact=False):
+    # compact=True: a TokenBuffer (parallel arrays) instead of a list of Tokens
+    if compact:
+        return Lexer(input_text).tokenize_compact()
+    return list(Lexer(input_text).tokenize())
 
 if __name__ == "__main__":
+    if "--stream" in sys.argv[1:]:
+        # One expression per line from stdin, lexed as the feed arrives
+        for tokens in StreamLexer(sys.stdin.buffer).expressions():
+            for token in tokens:
+                print(token)
+            print()
+        sys.exit()
+
     user_input = input("Enter a mathematical expression: ")
     tokens = test_lexer(user_input)
     print("\nTokenized Output:")
@@ -0,0 +1,144 @@
+"""
+Equivalence tests of the lexer: every entry point (str, bytes, compact,
+streamed, re-lexed, one token at a time) must give the token stream of the
+original character-by-character lexer on seeded random input.
+
+Run from the lab3 directory:
+    python -m pytest
+"""
+import io
+import math
+import random
+import unittest
+
+from lexer import Lexer, StreamLexer, relex, tokenize, tokenize_compact
+from tokens import CONSTANT_VALUES, TokenType
+
+FUNCTIONS = {
+    "sin": TokenType.SIN, "cos": TokenType.COS, "tan": TokenType.TAN, "log": TokenType.LOG,
+    "sqrt": TokenType.SQRT, "exp": TokenType.EXP, "abs": TokenType.ABS, "pow": TokenType.POW,
+}
+CONSTANTS = {"pi": TokenType.PI, "e": TokenType.E}
+OPERATORS = {
+    "+": TokenType.PLUS, "-": TokenType.MINUS, "*": TokenType.MULTIPLY, "/": TokenType.DIVIDE,
+    "%": TokenType.MODULO, "^": TokenType.EXPONENT, "!": TokenType.FACTORIAL,
+    "(": TokenType.LPAREN, ")": TokenType.RPAREN,
+}
+# ASCII, operators and keywords, plus non-ASCII spaces, digits, letters,
+# numerals that are not digits (½, ², Ⅷ), marks and separators
+ALPHABET = ("0123456789..  +-*/()^!%_sincoslgpexqrtabPIE\n\t"
+            "é\xa0٣² ٠½Ⅷ\U0001d7d9\x1c\x85​́一")
+
+
+def reference_tokens(text):
+    """
+    (type, value, start, end) of each token, as the original lexer read
+    them: whitespace by str.isspace, names by str.isalpha, numbers of
+    decimal digits with at most one point. Where it raised (a "." with no
+    digit after it, a non-decimal digit such as ²) the character is INVALID.
+    """
+    pos = 0
+    while pos < len(text):
+        char = text[pos]
+        start = pos
+        if char.isspace():
+            pos += 1
+            continue
+        if char.isdecimal() or (char == "." and text[pos + 1:pos + 2].isdecimal()):
+            seen_point = False
+            while pos < len(text) and (text[pos].isdecimal() or (text[pos] == "." and not seen_point)):
+                seen_point = seen_point or text[pos] == "."
+                pos += 1
+            number = text[start:pos]
+            value = float(number) if seen_point else int(number)
+            yield (TokenType.FLOAT if seen_point else TokenType.INTEGER), value, start, pos
+        elif char.isalpha():
+            while pos < len(text) and text[pos].isalpha():
+                pos += 1
+            name = text[start:pos]
+            if name.lower() in FUNCTIONS:
+                yield FUNCTIONS[name.lower()], name.lower(), start, pos
+            elif name.lower() in CONSTANTS:
+                type_ = CONSTANTS[name.lower()]
+                yield type_, CONSTANT_VALUES[type_], start, pos
+            else:
+                yield TokenType.INVALID, name, start, pos
+        else:
+            pos += 1
+            yield OPERATORS.get(char, TokenType.INVALID), char, start, pos
+    yield TokenType.EOF, None, len(text), len(text)
+
+
+def comparable(tokens):
+    return [(token.type, "nan" if isinstance(token.value, float) and math.isnan(token.value) else token.value)
+            for token in tokens]
+
+
+def random_texts(seed, count=2000):
+    rng = random.Random(seed)
+    yield from ["n½", "x²y", "Ⅷ", "1\xa0+٣", ".٣", "12.é", "sin(2) + 3.5 * PI", "..5", "1.2.3"]
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+
+
+class LexerEquivalenceTest(unittest.TestCase):
+    def test_tokenize(self):
+        for text in random_texts(1):
+            expected = [(type_, value) for type_, value, _start, _end in reference_tokens(text)]
+            with self.subTest(text=text):
+                self.assertEqual(comparable(tokenize(text)), expected)
+                self.assertEqual(comparable(tokenize(text.encode())), expected)
+
+    def test_get_next_token(self):
+        for text in random_texts(2):
+            lexer = Lexer(text)
+            tokens = [lexer.get_next_token()]
+            while tokens[-1].type != TokenType.EOF:
+                tokens.append(lexer.get_next_token())
+            with self.subTest(text=text):
+                self.assertEqual(comparable(tokens), comparable(tokenize(text)))
+
+    def test_compact_spans(self):
+        for text in random_texts(3):
+            expected = [(type_, start, end) for type_, _value, start, end in reference_tokens(text)]
+            data = text.encode()
+            compact, spans = tokenize_compact(text), tokenize_compact(data)
+            with self.subTest(text=text):
+                self.assertEqual(list(zip(compact.types, compact.starts, compact.ends)), expected)
+                self.assertEqual(comparable(compact), comparable(tokenize(text)))
+                self.assertEqual(
+                    [(type_, len(data[:start].decode()), len(data[:end].decode()))
+                     for type_, start, end in zip(spans.types, spans.starts, spans.ends)],
+                    expected)
+
+    def test_stream(self):
+        for text in random_texts(4, count=500):
+            expected = comparable(tokenize(text))
+            for chunk_size in (1, 2, 3, 7, 64):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    self.assertEqual(comparable(StreamLexer(io.StringIO(text), chunk_size)), expected)
+                    self.assertEqual(comparable(StreamLexer(io.BytesIO(text.encode()), chunk_size)), expected)
+
+    def test_relex(self):
+        rng = random.Random(5)
+        texts = list(random_texts(5, count=1000))
+        for text in texts:
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, len(text) - offset)
+            inserted = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 4)))
+            edited = text[:offset] + inserted + text[offset + deleted:]
+            for source, edit in ((text, (offset, deleted, inserted)),
+                                 (text.encode(), (len(text[:offset].encode()),
+                                                  len(text[offset:offset + deleted].encode()),
+                                                  inserted.encode()))):
+                buffer = tokenize_compact(source)
+                relex(buffer, *edit)
+                fresh = tokenize_compact(edited if isinstance(source, str) else edited.encode())
+                with self.subTest(text=text, edit=edit):
+                    self.assertEqual(list(buffer.types), list(fresh.types))
+                    self.assertEqual(list(buffer.starts), list(fresh.starts))
+                    self.assertEqual(list(buffer.ends), list(fresh.ends))
+
+
+if __name__ == "__main__":
+    unittest.main()
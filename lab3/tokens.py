@@ -1,32 +1,135 @@
-class TokenType:
-    INTEGER = "INTEGER"
-    FLOAT = "FLOAT"
-    PLUS = "PLUS"
-    MINUS = "MINUS"
-    MULTIPLY = "MULTIPLY"
-    DIVIDE = "DIVIDE"
-    MODULO = "MODULO"
-    EXPONENT = "EXPONENT"
-    FACTORIAL = "FACTORIAL"
-    LPAREN = "LPAREN"
-    RPAREN = "RPAREN"
-    SIN = "SIN"
-    COS = "COS"
-    TAN = "TAN"
-    LOG = "LOG"
-    SQRT = "SQRT"
-    EXP = "EXP"
-    ABS = "ABS"
-    POW = "POW"
-    PI = "PI"
-    E = "E"
-    EOF = "EOF"
-    INVALID = "INVALID"
+from array import array
+from enum import IntEnum
+
+
+class TokenType(IntEnum):
+    INTEGER = 1
+    FLOAT = 2
+    PLUS = 3
+    MINUS = 4
+    MULTIPLY = 5
+    DIVIDE = 6
+    MODULO = 7
+    EXPONENT = 8
+    FACTORIAL = 9
+    LPAREN = 10
+    RPAREN = 11
+    SIN = 12
+    COS = 13
+    TAN = 14
+    LOG = 15
+    SQRT = 16
+    EXP = 17
+    ABS = 18
+    POW = 19
+    PI = 20
+    E = 21
+    EOF = 22
+    INVALID = 23
+
+    # Small ints in memory, but printed by name ("PLUS") as before
+    def __str__(self):
+        return self.name
+
+    def __format__(self, spec):
+        return format(self.name, spec)
+
+
+FUNCTION_TYPES = frozenset({
+    TokenType.SIN, TokenType.COS, TokenType.TAN, TokenType.LOG,
+    TokenType.SQRT, TokenType.EXP, TokenType.ABS, TokenType.POW,
+})
+CONSTANT_VALUES = {TokenType.PI: 3.14159, TokenType.E: 2.71828}
+
 
 class Token:
+    __slots__ = ("type", "value")
+
     def __init__(self, type_, value=None):
         self.type = type_
         self.value = value
 
     def __repr__(self):
         return f"Token({self.type}, {repr(self.value)})"
+
+
+class TokenBuffer:
+    """
+    Compact token stream: parallel arrays of token types, start/end offsets
+    into the source text and numeric values (numbers and constants), about
+    17 bytes per token. Values and texts are derived on demand; type_at()
+    and value_at() let a parser walk the stream without creating Tokens.
+
+    The source may also be bytes, a memoryview or an mmap (UTF-8). Without
+    with_values only the spans are stored and numbers are parsed from the
+    source when value_at() asks for them.
+    """
+
+    def __init__(self, source, with_values=True):
+        self.source = source
+        offset = "I" if len(source) < 2 ** 32 else "Q"  # 4-byte offsets unless the source is huge
+        self.types = array("b")
+        self.starts = array(offset)
+        self.ends = array(offset)
+        self.values = array("d") if with_values else None
+
+    def append(self, type_, start, end, value=0.0):
+        self.types.append(type_)
+        self.starts.append(start)
+        self.ends.append(end)
+        if self.values is not None:
+            self.values.append(value)
+
+    def __len__(self):
+        return len(self.types)
+
+    def type_at(self, i):
+        """Type of token i as a plain int (compares equal to TokenType members)."""
+        return self.types[i]
+
+    def span_at(self, i):
+        return self.starts[i], self.ends[i]
+
+    def text_at(self, i):
+        text = self.source[self.starts[i]:self.ends[i]]
+        if not isinstance(text, str):
+            text = bytes(text).decode("utf-8", "replace")
+        return text
+
+    def value_at(self, i):
+        """The value a Token would carry (see lexer.tokenize)."""
+        type_ = self.types[i]
+        if type_ in CONSTANT_VALUES:
+            return CONSTANT_VALUES[type_]
+        if type_ == TokenType.INTEGER:
+            if self.values is None:
+                return int(self.text_at(i))
+            value = self.values[i]
+            return int(value) if abs(value) < 2 ** 53 else int(self.text_at(i))  # Beyond exact doubles
+        if type_ == TokenType.FLOAT:
+            return self.values[i] if self.values is not None else float(self.text_at(i))
+        if type_ == TokenType.EOF:
+            return None
+        if type_ in FUNCTION_TYPES:
+            return self.text_at(i).lower()
+        return self.text_at(i)
+
+    def token(self, i):
+        """Token object for entry i."""
+        return Token(TokenType(self.types[i]), self.value_at(i))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.token(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.token(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.token(i)
+
+    @property
+    def nbytes(self):
+        parts = (self.types, self.starts, self.ends, self.values)
+        return sum(len(part) * part.itemsize for part in parts if part is not None)
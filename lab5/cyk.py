@@ -0,0 +1,171 @@
+import time
+
+
+def _bits(mask):
+    """Indexes of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CYKChart:
+    """
+    Filled CYK chart for one input.
+
+    cells[(i, j)] is a bitmask of the non-terminals deriving tokens[i:j].
+    The same spans are also indexed per non-terminal as bitmasks of
+    positions: left_ends[A][i] has bit j set and right_starts[A][j] has bit i
+    set when A derives tokens[i:j].
+    """
+
+    def __init__(self, parser, tokens):
+        self.parser = parser
+        self.tokens = tokens
+        self.cells = {}
+        self.left_ends = None
+        self.right_starts = None
+        self.fill_time = 0.0
+        self.accepted = False
+
+    def tree(self):
+        """
+        One parse tree as nested tuples: (A, left, right) for binary rules and
+        (A, token) for terminal rules; None if the input is not accepted.
+        """
+        if not self.accepted:
+            return None
+
+        parser = self.parser
+        names = parser.nonterminals
+        n = len(self.tokens)
+        root = [names[parser.start]]
+        work = [(root, parser.start, 0, n)]  # Explicit stack: no recursion limit
+        order = []  # Nodes in creation order; children always come later
+
+        while work:
+            node, head, i, j = work.pop()
+            order.append(node)
+            if j == i + 1:
+                node.append(self.tokens[i])
+                continue
+
+            # Any split k with B over (i, k), C over (k, j) and A -> B C
+            between = ((1 << j) - 1) & ~((1 << (i + 1)) - 1)
+            head_bit = 1 << head
+            for left, right, heads in parser.rules:
+                if not heads & head_bit:
+                    continue
+                splits = self.left_ends[left][i] & self.right_starts[right][j] & between
+                if splits:
+                    k = (splits & -splits).bit_length() - 1
+                    left_node, right_node = [names[left]], [names[right]]
+                    node.extend([left_node, right_node])
+                    work.append((right_node, right, k, j))
+                    work.append((left_node, left, i, k))
+                    break
+
+        # Turn the lists into tuples bottom-up
+        frozen = {}
+        for node in reversed(order):
+            frozen[id(node)] = tuple(frozen.get(id(part), part) for part in node)
+        return frozen[id(root)]
+
+
+class CYKParser:
+    """
+    CYK recognizer and parser for a grammar in Chomsky Normal Form, in the
+    format returned by CFGtoCNFConverter.convert(): {A: [(B, C), (a,), ...]}.
+
+    Non-terminals are interned as bit positions, so a chart cell is one int.
+    Binary rules are grouped in a (B, C) -> heads table: for each span we
+    test a split with one AND of two position masks and add all heads of
+    that pair with one OR.
+    """
+
+    def __init__(self, cnf, start_symbol):
+        names = set(cnf)
+        for bodies in cnf.values():
+            for body in bodies:
+                if len(body) == 2:
+                    names.update(body)
+        self.nonterminals = sorted(names)
+        self.index = {name: i for i, name in enumerate(self.nonterminals)}
+        self.start = self.index[start_symbol]
+
+        self.terminal_heads = {}  # terminal -> mask of A with A -> terminal
+        pair_heads = {}           # (B, C) -> mask of A with A -> B C
+        for head, bodies in cnf.items():
+            head_bit = 1 << self.index[head]
+            for body in bodies:
+                if len(body) == 1 and body[0] not in self.index:
+                    self.terminal_heads[body[0]] = self.terminal_heads.get(body[0], 0) | head_bit
+                elif len(body) == 2:
+                    pair = (self.index[body[0]], self.index[body[1]])
+                    pair_heads[pair] = pair_heads.get(pair, 0) | head_bit
+                else:
+                    raise ValueError(f"Not in CNF: {head} → {' '.join(body)}")
+
+        self.rules = [(left, right, heads) for (left, right), heads in sorted(pair_heads.items())]
+        self.rules_by_left = [[] for _ in self.nonterminals]
+        for left, right, heads in self.rules:
+            self.rules_by_left[left].append((right, heads))
+
+    def fill(self, tokens):
+        """Builds the chart for tokens (a string or a list of terminals)."""
+        tokens = list(tokens)
+        n = len(tokens)
+        chart = CYKChart(self, tokens)
+        count = len(self.nonterminals)
+        left_ends = [[0] * (n + 1) for _ in range(count)]
+        right_starts = [[0] * (n + 1) for _ in range(count)]
+        starting = [0] * (n + 1)  # mask of non-terminals with a span starting at i
+        cells = chart.cells
+        rules_by_left = self.rules_by_left
+        terminal_heads = self.terminal_heads
+
+        started = time.perf_counter()
+        for j in range(1, n + 1):
+            end_bit = 1 << j
+            # Spans (i, j) by decreasing i: every (i, k) and (k, j) they need is done
+            for i in range(j - 1, -1, -1):
+                if i == j - 1:
+                    heads = terminal_heads.get(tokens[i], 0)
+                else:
+                    heads = 0
+                    for left in _bits(starting[i]):
+                        splits = left_ends[left][i]
+                        for right, pair_heads in rules_by_left[left]:
+                            if pair_heads & ~heads and right_starts[right][j] & splits:
+                                heads |= pair_heads
+                if heads:
+                    cells[(i, j)] = heads
+                    starting[i] |= heads
+                    start_bit = 1 << i
+                    for head in _bits(heads):
+                        left_ends[head][i] |= end_bit
+                        right_starts[head][j] |= start_bit
+
+        chart.fill_time = time.perf_counter() - started
+        chart.left_ends = left_ends
+        chart.right_starts = right_starts
+        chart.accepted = n > 0 and bool(cells.get((0, n), 0) >> self.start & 1)
+        return chart
+
+    def recognize(self, tokens):
+        return self.fill(tokens).accepted
+
+    def parse(self, tokens):
+        """Parse tree of tokens (see CYKChart.tree), or None if rejected."""
+        return self.fill(tokens).tree()
+
+
+if __name__ == "__main__":  # From the repository root: python -m lab5.cyk
+    from lab5.grammar import CFGtoCNFConverter, cfg
+
+    cnf = CFGtoCNFConverter(cfg, start_symbol="S").convert()
+    parser = CYKParser(cnf, "S")
+    for word in ["d", "dd", "dad", "dda", "ab", "ddddd"]:
+        chart = parser.fill(word)
+        print(f"{word!r}: {chart.accepted} ({chart.fill_time * 1000:.3f} ms)")
+    print(parser.parse("dad"))
@@ -0,0 +1,378 @@
+from lab1lab2.grammar_analysis import grammar_analysis
+
+
+class SPPFNode:
+    """
+    Node of a shared packed parse forest.
+
+    label is a grammar symbol (symbol and terminal nodes) or a dotted rule
+    (head, body, dot) for intermediate nodes. Each entry of families is one
+    way to build the node: a tuple of one or two child nodes, or () for ε.
+    A node with more than one family is a point of ambiguity.
+    """
+
+    __slots__ = ("label", "start", "end", "families")
+
+    def __init__(self, label, start, end):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.families = []
+
+    def add_family(self, family):
+        if family not in self.families:
+            self.families.append(family)
+
+    @property
+    def is_ambiguous(self):
+        return len(self.families) > 1
+
+    def count_trees(self):
+        """Number of parse trees packed below this node (ValueError if infinite)."""
+        counts = {}
+        active = set()
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in counts:
+                continue
+            if expanded:
+                active.discard(node)
+                if not node.families:
+                    counts[node] = 1
+                    continue
+                total = 0
+                for family in node.families:
+                    product = 1
+                    for child in family:
+                        product *= counts[child]
+                    total += product
+                counts[node] = total
+                continue
+            if node in active:
+                raise ValueError("Cyclic forest: infinitely many parse trees")
+            active.add(node)
+            stack.append((node, True))
+            for family in node.families:
+                for child in family:
+                    if child not in counts:
+                        if child in active:
+                            raise ValueError("Cyclic forest: infinitely many parse trees")
+                        stack.append((child, False))
+        return counts[self]
+
+    def __repr__(self):
+        return f"SPPFNode({self.label!r}, {self.start}, {self.end}, families={len(self.families)})"
+
+
+class EarleyParser:
+    """
+    Earley parser for any context-free grammar given as a production dict,
+    either in the ExtendedGrammar form ({"S": ["aA", "ε"]}) or in the
+    CFGtoCNFConverter form ({"S": [["d", "B"], ["ε"]]}). Keys are the
+    non-terminals; every other symbol is a terminal. Rules and nullable
+    non-terminals come from the shared GrammarAnalysis of the productions.
+
+    Dotted rules are numbered once, so an Earley item is an (int, int) pair.
+    Each non-terminal has a precomputed prediction set (every rule that can
+    start at the same position through leftmost non-terminals). Nullable
+    non-terminals are stepped over at prediction time (Aycock-Horspool) in
+    recognize(), and right recursion is completed through Leo items, so
+    recognize() is linear on right-linear and LR-regular grammars. parse()
+    builds an SPPF following Scott's algorithm, so ambiguous parses share
+    sub-forests. It uses the same Leo items: the nodes a Leo completion
+    skips are built after parsing, only for the chains the root reaches, so
+    right recursion stays linear there too.
+    """
+
+    def __init__(self, productions, start_symbol):
+        self.start_symbol = start_symbol
+        self.nonterminals = set(productions)
+        analysis = grammar_analysis(productions, start_symbol)
+
+        # Dotted rules: item ids run through each rule's positions in order
+        self.rules = []          # rule -> (head, body)
+        self.rule_items = {}     # head -> first item id of each of its rules
+        self.next_symbol = []    # item -> symbol after the dot, None if complete
+        self.item_rule = []      # item -> rule
+        self.item_dot = []       # item -> dot position
+        self.item_label = []     # item -> SPPF label after moving to it (see parse)
+        for head in productions:
+            self.rule_items.setdefault(head, [])
+            for body in analysis.productions_of(head):
+                rule = len(self.rules)
+                self.rules.append((head, body))
+                self.rule_items[head].append(len(self.next_symbol))
+                for dot in range(len(body) + 1):
+                    self.next_symbol.append(body[dot] if dot < len(body) else None)
+                    self.item_rule.append(rule)
+                    self.item_dot.append(dot)
+                    if dot == len(body):
+                        self.item_label.append(head)
+                    elif dot == 1:
+                        self.item_label.append(None)  # The child node stands for the item
+                    else:
+                        self.item_label.append((head, body, dot))
+
+        self.nullable = analysis.nullable
+        self.predictions = self._predictions()
+
+    def _predictions(self):
+        # prediction set of A: start items of every B in the left-corner closure
+        # of A (B starts a rule of A, possibly after nullable symbols)
+        corners = {head: set() for head in self.nonterminals}
+        for head, body in self.rules:
+            for symbol in body:
+                if symbol in self.nonterminals:
+                    corners[head].add(symbol)
+                if symbol not in self.nullable:
+                    break
+
+        predictions = {}
+        for head in self.nonterminals:
+            closure = {head}
+            stack = [head]
+            while stack:
+                for corner in corners[stack.pop()]:
+                    if corner not in closure:
+                        closure.add(corner)
+                        stack.append(corner)
+            predictions[head] = (
+                frozenset(closure),
+                [item for symbol in sorted(closure) for item in self.rule_items[symbol]],
+            )
+        return predictions
+
+    def _head(self, item):
+        return self.rules[self.item_rule[item]][0]
+
+    def _leo(self, history, leo, j, symbol):
+        # Topmost item of the deterministic reduction path above set j for
+        # symbol (Leo): while the only item of set j waiting for symbol has it
+        # as its last symbol, completing symbol just completes that item, so
+        # the chain is followed down to its top once and memoized per set.
+        # Links into set 0 are not followed, so the complete items of the
+        # start symbol over the whole input are never skipped.
+        path = []  # (memo, symbol, item completed by that link) from j down
+        top = None
+        while True:
+            memo = leo[j]
+            if symbol in memo:
+                top = memo[symbol]
+                break
+            entries = history[j].get(symbol, ())
+            if len(entries) != 1 or self.next_symbol[entries[0][0] + 1] is not None:
+                memo[symbol] = None
+                break
+            item, origin = entries[0][:2]  # parse() stores (item, origin, node)
+            path.append((memo, symbol, (item + 1, origin)))
+            if not 0 < origin < j:
+                break
+            j, symbol = origin, self._head(item)
+        for memo, symbol, completed in reversed(path):
+            top = top or completed
+            memo[symbol] = top
+        return top
+
+    def recognize(self, tokens):
+        """True if tokens (a string or a list of terminals) is in the language."""
+        tokens = list(tokens)
+        nonterminals, nullable = self.nonterminals, self.nullable
+        next_symbol = self.next_symbol
+        start = self.start_symbol
+        if start not in nonterminals:
+            return False
+
+        seen = set()
+        waiting = {}  # symbol -> [(item, origin)] of the current set
+        agenda = []
+
+        def add(item, origin):
+            while (item, origin) not in seen:
+                seen.add((item, origin))
+                agenda.append((item, origin))
+                symbol = next_symbol[item]
+                if symbol is None:
+                    return
+                waiting.setdefault(symbol, []).append((item, origin))
+                if symbol not in nullable:
+                    return
+                item += 1  # Aycock-Horspool: also step over the nullable symbol
+
+        history = []  # waiting dicts of the finished sets, for completion
+        leo = []      # per finished set: symbol -> topmost Leo item or None
+        for item in self.predictions[start][1]:
+            add(item, 0)
+
+        for i in range(len(tokens) + 1):
+            predicted = set()
+            position = 0
+            while position < len(agenda):
+                item, origin = agenda[position]
+                position += 1
+                symbol = next_symbol[item]
+                if symbol is None:
+                    if origin == i:
+                        continue  # Empty completion: handled when predicting
+                    head = self._head(item)
+                    top = self._leo(history, leo, origin, head)
+                    if top is not None:
+                        add(*top)
+                        continue
+                    for waiting_item, waiting_origin in history[origin].get(head, ()):
+                        add(waiting_item + 1, waiting_origin)
+                elif symbol in nonterminals and symbol not in predicted:
+                    closure, items = self.predictions[symbol]
+                    predicted |= closure
+                    for predicted_item in items:
+                        add(predicted_item, i)
+
+            if i == len(tokens):
+                return any(
+                    next_symbol[item] is None and origin == 0 and self._head(item) == start
+                    for item, origin in agenda
+                )
+
+            # Scan the next token into a fresh set
+            history.append(waiting)
+            leo.append({})
+            scanned = waiting.get(tokens[i], ())
+            seen, waiting, agenda = set(), {}, []
+            for item, origin in scanned:
+                add(item + 1, origin)
+            if not agenda:
+                return False
+
+    def parse(self, tokens):
+        """
+        Root SPPFNode (start symbol over the whole input) of all parses of
+        tokens, or None if the input is not in the language.
+        """
+        tokens = list(tokens)
+        n = len(tokens)
+        nonterminals = self.nonterminals
+        next_symbol, item_label = self.next_symbol, self.item_label
+        if self.start_symbol not in nonterminals:
+            return None
+
+        sets = [set() for _ in range(n + 1)]        # E_i: (item, origin, node)
+        waiting = [{} for _ in range(n + 1)]        # E_i indexed by the non-terminal after the dot
+        leo = [{} for _ in range(n + 1)]            # Memo of _leo per set
+        nodes = {}                                   # V: (label, start, end) -> node
+        deferred = {}                                # Leo top node -> [(set, symbol, bottom node)]
+
+        def make_node(item, start, end, left, right):
+            # SPPF node for item (dot already moved over the symbol of right)
+            label = item_label[item]
+            if label is None:
+                return right
+            key = (label, start, end)
+            node = nodes.get(key)
+            if node is None:
+                node = nodes[key] = SPPFNode(label, start, end)
+            node.add_family((right,) if left is None else (left, right))
+            return node
+
+        def expand(top, j, symbol, node):
+            # Builds the nodes a Leo completion skipped: up the chain from
+            # symbol completed over (j, top.end) as node to top
+            while True:
+                item, origin, left = waiting[j][symbol][0]
+                node = make_node(item + 1, origin, top.end, left, node)
+                if node is top:
+                    return
+                j, symbol = origin, self._head(item)
+
+        def expects_nonterminal(item):
+            symbol = next_symbol[item]
+            return symbol is None or symbol in nonterminals
+
+        def add(i, entry, agenda):
+            if entry not in sets[i]:
+                sets[i].add(entry)
+                agenda.append(entry)
+                symbol = next_symbol[entry[0]]
+                if symbol is not None:
+                    waiting[i].setdefault(symbol, []).append(entry)
+
+        def place(i, entry, agenda, scan_queue):
+            # Items waiting for a non-terminal (or complete) stay in E_i;
+            # items waiting for the next token go to the scan queue
+            if expects_nonterminal(entry[0]):
+                add(i, entry, agenda)
+            elif i < n and next_symbol[entry[0]] == tokens[i]:
+                scan_queue.add(entry)
+
+        agenda = []
+        scan_queue = set()
+        for item in self.rule_items[self.start_symbol]:
+            place(0, (item, 0, None), agenda, scan_queue)
+
+        for i in range(n + 1):
+            completed_empty = {}  # H: nullable non-terminal -> its (i, i) node
+            predicted = set()
+            while agenda:
+                item, origin, node = agenda.pop()
+                symbol = next_symbol[item]
+
+                if symbol is not None:  # Predict (only non-terminals reach the agenda)
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for start_item in self.rule_items.get(symbol, ()):
+                            place(i, (start_item, i, None), agenda, scan_queue)
+                    if symbol in completed_empty:
+                        moved = make_node(item + 1, origin, i, node, completed_empty[symbol])
+                        place(i, (item + 1, origin, moved), agenda, scan_queue)
+                    continue
+
+                # Complete
+                head = item_label[item]
+                if node is None:  # Empty rule: ε node for (head, i, i)
+                    key = (head, i, i)
+                    node = nodes.get(key)
+                    if node is None:
+                        node = nodes[key] = SPPFNode(head, i, i)
+                    node.add_family(())
+                if origin == i:
+                    completed_empty[head] = node
+                else:
+                    top = self._leo(waiting, leo, origin, head)
+                    if top is not None and top != (waiting[origin][head][0][0] + 1, waiting[origin][head][0][1]):
+                        # Leo: only the topmost item of the chain is added; the
+                        # nodes in between are built if the root reaches them
+                        key = (item_label[top[0]], top[1], i)
+                        top_node = nodes.get(key)
+                        if top_node is None:
+                            top_node = nodes[key] = SPPFNode(key[0], top[1], i)
+                        deferred.setdefault(top_node, []).append((origin, head, node))
+                        place(i, top + (top_node,), agenda, scan_queue)
+                        continue
+                for waiting_item, waiting_origin, waiting_node in list(waiting[origin].get(head, ())):
+                    moved = make_node(waiting_item + 1, waiting_origin, i, waiting_node, node)
+                    place(i, (waiting_item + 1, waiting_origin, moved), agenda, scan_queue)
+
+            if i == n:
+                break
+
+            # Scan tokens[i]; nodes from here on end at i + 1
+            terminal = SPPFNode(tokens[i], i, i + 1)
+            current, scan_queue = scan_queue, set()
+            for item, origin, node in current:
+                moved = make_node(item + 1, origin, i + 1, node, terminal)
+                place(i + 1, (item + 1, origin, moved), agenda, scan_queue)
+
+        root = nodes.get((self.start_symbol, 0, n))
+        if root is not None and deferred:
+            # Expand the skipped chains below the root, each top before its children
+            seen = set()
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if node in seen:
+                    continue
+                seen.add(node)
+                for chain in deferred.pop(node, ()):
+                    expand(node, *chain)
+                for family in node.families:
+                    stack.extend(family)
+        return root
@@ -1,45 +1,53 @@
-from collections import defaultdict
 import itertools
 
+from lab1lab2.compact_grammar import CompactGrammar
+from lab1lab2.grammar_analysis import grammar_analysis
+
 
 class CFGtoCNFConverter:
-    def __init__(self, grammar, start_symbol):
-        self.grammar = defaultdict(list)
-        for head, bodies in grammar.items():
-            for body in bodies:
-                self.grammar[head].append(tuple(body))
+    def __init__(self, grammar, start_symbol, verbose=True):
+        # Productions are kept as int arrays (see CompactGrammar); names are
+        # only looked up for printing. The non-terminals are the heads (plus
+        # the X_/Y symbols added below), so names need not be upper case.
+        self.grammar = CompactGrammar.from_productions(grammar)
+        self.symbols = self.grammar.symbols
+        self.nonterminals = {self.symbols.get(head) for head in grammar}
         self.start_symbol = start_symbol
         self.counter = 1
         self.term_map = {}
+        self.verbose = verbose  # Print the grammar after every step
+
+    def _is_nonterminal(self, symbol):
+        return symbol in self.nonterminals
+
+    def _new_nonterminal(self, name):
+        symbol = self.symbols.intern(name)
+        self.nonterminals.add(symbol)
+        return symbol
+
+    def _is_unit(self, prod):
+        return len(prod) == 1 and self._is_nonterminal(prod[0])
 
     def print_grammar(self, title):
+        if not self.verbose:
+            return
         print(f"\n=== {title} ===")
-        for head in sorted(self.grammar.keys()):
-            bodies = [" ".join(body) for body in self.grammar[head]]
-            print(f"{head} → {' | '.join(bodies)}")
+        names = self.symbols.names
+        for head, prods in sorted(self.grammar.items(), key=lambda item: names[item[0]]):
+            bodies = [" ".join(self.grammar.names(body)) or "ε" for body in prods]
+            print(f"{names[head]} → {' | '.join(bodies)}")
+
+    def analysis(self):
+        """Shared GrammarAnalysis of the grammar as it is after the last pass."""
+        return grammar_analysis(self.grammar.to_productions(), self.start_symbol)
 
     def eliminate_epsilon(self):
-        nullable = set()
-        for head, prods in self.grammar.items():
-            for prod in prods:
-                if prod == ('ε',):
-                    nullable.add(head)
-
-        # Remove ε-productions
-        for head in self.grammar:
-            self.grammar[head] = [p for p in self.grammar[head] if p != ('ε',)]
-
-        changed = True
-        while changed:
-            changed = False
-            for head, prods in self.grammar.items():
-                for prod in prods:
-                    if all(sym in nullable for sym in prod):
-                        if head not in nullable:
-                            nullable.add(head)
-                            changed = True
-
-        new_grammar = defaultdict(list)
+        nullable = {self.symbols.get(head) for head in self.analysis().nullable}
+
+        # ε-productions (empty bodies) are dropped, every other production
+        # gets one copy per way of removing its nullable symbols
+        new_grammar = CompactGrammar(self.symbols)
+        added = set()
         for head, prods in self.grammar.items():
             for prod in prods:
                 indices = [i for i, sym in enumerate(prod) if sym in nullable]
@@ -48,73 +56,79 @@ class CFGtoCNFConverter:
                     for i, remove in zip(indices, mask):
                         if remove:
                             new_prod[i] = None
-                    new_prod = tuple(sym for sym in new_prod if sym)
-                    if new_prod and new_prod not in new_grammar[head]:
-                        new_grammar[head].append(new_prod)
+                    new_prod = tuple(sym for sym in new_prod if sym is not None)
+                    if new_prod and (head, new_prod) not in added:
+                        added.add((head, new_prod))
+                        new_grammar.add(head, new_prod)
 
         self.grammar = new_grammar
         self.print_grammar("After Eliminating ε-productions")
 
     def eliminate_unit_productions(self):
+        productions = dict(self.grammar.items())
         unit_pairs = set()
-        for head in self.grammar:
-            for prod in self.grammar[head]:
-                if len(prod) == 1 and prod[0].isupper():
+        for head, prods in productions.items():
+            for prod in prods:
+                if self._is_unit(prod):
                     unit_pairs.add((head, prod[0]))
 
         while True:
             new_pairs = unit_pairs.copy()
             for (A, B) in unit_pairs:
-                for prod in self.grammar.get(B, []):
-                    if len(prod) == 1 and prod[0].isupper():
+                for prod in productions.get(B, []):
+                    if self._is_unit(prod):
                         new_pairs.add((A, prod[0]))
             if new_pairs == unit_pairs:
                 break
             unit_pairs = new_pairs
 
-        new_grammar = defaultdict(list)
-        for head, prods in self.grammar.items():
+        new_grammar = CompactGrammar(self.symbols)
+        added = set()
+        for head, prods in productions.items():
             for prod in prods:
-                if not (len(prod) == 1 and prod[0].isupper()):
-                    new_grammar[head].append(prod)
+                if not self._is_unit(prod):
+                    added.add((head, prod))
+                    new_grammar.add(head, prod)
 
-        for (A, B) in unit_pairs:
-            for prod in self.grammar[B]:
-                if not (len(prod) == 1 and prod[0].isupper()) and prod not in new_grammar[A]:
-                    new_grammar[A].append(prod)
+        for (A, B) in sorted(unit_pairs):
+            for prod in productions.get(B, []):
+                if not self._is_unit(prod) and (A, prod) not in added:
+                    added.add((A, prod))
+                    new_grammar.add(A, prod)
 
         self.grammar = new_grammar
         self.print_grammar("After Eliminating Unit Productions")
 
     def replace_terminals_in_long_productions(self):
-        updated_grammar = defaultdict(list)
+        updated_grammar = CompactGrammar(self.symbols)
         for head, prods in self.grammar.items():
             for prod in prods:
                 if len(prod) > 1:
                     new_prod = []
                     for sym in prod:
-                        if not sym.isupper():
-                            if sym not in self.term_map:
-                                new_nonterminal = f"X_{sym}"
-                                self.term_map[sym] = new_nonterminal
-                                updated_grammar[new_nonterminal].append((sym,))
-                            new_prod.append(self.term_map[sym])
+                        if not self._is_nonterminal(sym):
+                            name = self.symbols.name(sym)
+                            if name not in self.term_map:
+                                new_nonterminal = f"X_{name}"
+                                self.term_map[name] = new_nonterminal
+                                updated_grammar.add(self._new_nonterminal(new_nonterminal), (sym,))
+                            new_prod.append(self.symbols.get(self.term_map[name]))
                         else:
                             new_prod.append(sym)
-                    updated_grammar[head].append(tuple(new_prod))
+                    updated_grammar.add(head, new_prod)
                 else:
-                    updated_grammar[head].append(prod)
+                    updated_grammar.add(head, prod)
         self.grammar = updated_grammar
         self.print_grammar("After Replacing Terminals in Long Productions")
 
     def convert_to_binary_rules(self):
         def create_new_symbol():
-            sym = f"Y{self.counter}"
+            sym = self._new_nonterminal(f"Y{self.counter}")
             self.counter += 1
             return sym
 
         bin_cache = {}  # (A, B) → New symbol
-        updated_grammar = defaultdict(list)
+        updated_grammar = CompactGrammar(self.symbols)
 
         for head, prods in self.grammar.items():
             for prod in prods:
@@ -124,10 +138,10 @@ class CFGtoCNFConverter:
                     if pair not in bin_cache:
                         new_sym = create_new_symbol()
                         bin_cache[pair] = new_sym
-                        updated_grammar[new_sym].append(pair)
+                        updated_grammar.add(new_sym, pair)
                     new_nt = bin_cache[pair]
                     symbols = [new_nt] + symbols[2:]
-                updated_grammar[head].append(tuple(symbols))
+                updated_grammar.add(head, symbols)
 
         self.grammar = updated_grammar
         self.print_grammar("After Converting to Binary Rules")
@@ -139,7 +153,7 @@ class CFGtoCNFConverter:
         self.replace_terminals_in_long_productions()
         self.convert_to_binary_rules()
         self.print_grammar("Final CNF Grammar")
-        return dict(self.grammar)
+        return self.grammar.to_productions()
 
 
 # === Example input ===
@@ -151,5 +165,6 @@ cfg = {
     "C": [["A", "a"]]
 }
 
-converter = CFGtoCNFConverter(cfg, start_symbol="S")
-cnf = converter.convert()
\ No newline at end of file
+if __name__ == "__main__":  # From the repository root: python -m lab5.grammar
+    converter = CFGtoCNFConverter(cfg, start_symbol="S")
+    cnf = converter.convert()
\ No newline at end of file
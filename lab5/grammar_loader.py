@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from lab1lab2.compact_grammar import CompactGrammar
+from lab1lab2.finite_automaton import FiniteAutomaton
+from lab1lab2.grammar import ExtendedGrammar
+from lab1lab2.grammar_analysis import grammar_analysis
+from lab5.grammar import CFGtoCNFConverter
+
+EPSILON = "ε"
+CACHE_VERSION = b"3"  # Part of every cache key: bump when an artefact or its conversion changes
+DEFAULT_CACHE_DIR = ".grammar_cache"
+
+_TOKEN = re.compile(r'"[^"]*"|\'[^\']*\'|#.*|->|::=|→|\||[^\s|#]+')
+_ARROWS = {"->", "::=", "→"}
+
+
+def _parse_bnf_line(line, location):
+    # (head or None for a "|" continuation, [bodies]) of one non-empty line
+    tokens = _TOKEN.findall(line)
+    if tokens and tokens[-1].startswith("#"):
+        tokens.pop()  # Comment
+    if not tokens:
+        return None
+    if tokens[0] == "|":
+        head, rest = None, tokens[1:]
+    elif len(tokens) >= 2 and tokens[1] in _ARROWS:
+        head, rest = tokens[0], tokens[2:]
+    else:
+        raise ValueError(f"{location}: expected 'HEAD -> body | ...'")
+
+    bodies = [[]]
+    for token in rest:
+        if token == "|":
+            bodies.append([])
+        elif token in _ARROWS:
+            raise ValueError(f"{location}: unexpected {token!r}")
+        else:
+            if token[0] in "\"'":
+                token = token[1:-1]
+            if token != EPSILON:
+                bodies[-1].append(token)
+    return head, [body or [EPSILON] for body in bodies]
+
+
+def read_bnf(lines, name="<bnf>"):
+    """
+    (productions, start symbol) from an iterable of BNF lines, e.g.
+
+        # comment
+        S -> d B | A
+        A ::= d | d S
+            | a B d A B
+        B → a | "d" A | ε
+
+    Symbols are separated by spaces, so they can be several characters long
+    (quotes allow any text). Heads are the non-terminals, the first head is
+    the start symbol, and "ε" or an empty alternative is the empty body.
+    """
+    productions = {}
+    start_symbol = head = None
+    for number, line in enumerate(lines, 1):
+        parsed = _parse_bnf_line(line, f"{name}:{number}")
+        if parsed is None:
+            continue
+        line_head, bodies = parsed
+        if line_head is None:
+            if head is None:
+                raise ValueError(f"{name}:{number}: '|' before any rule")
+        else:
+            head = line_head
+        if start_symbol is None:
+            start_symbol = head
+        productions.setdefault(head, []).extend(bodies)
+    if start_symbol is None:
+        raise ValueError(f"{name}: no rules")
+    return productions, start_symbol
+
+
+def read_json(data, name="<json>"):
+    """
+    (productions, start symbol) from decoded JSON of the form
+    {"start": "S", "productions": {"S": [["d", "B"], ["A"]]}}; a body may
+    also be one string of space-separated symbols.
+    """
+    if "productions" not in data:
+        raise ValueError(f"{name}: missing 'productions'")
+    productions = {
+        head: [list(body) if not isinstance(body, str) else body.split() or [EPSILON] for body in bodies]
+        for head, bodies in data["productions"].items()
+    }
+    start_symbol = data.get("start", next(iter(productions), None))
+    return productions, start_symbol
+
+
+def _hashed_lines(file, digest):
+    # Decoded lines of a binary file, feeding the raw bytes to digest on the way
+    for raw in file:
+        digest.update(raw)
+        yield raw.decode("utf-8")
+
+
+def read_grammar(path):
+    """
+    (productions, start symbol, content hash) of a grammar file. BNF is
+    parsed line by line while it is read; files ending in .json are JSON.
+    """
+    digest = hashlib.sha256(CACHE_VERSION + b"\0")
+    with open(path, "rb") as file:
+        if str(path).endswith(".json"):
+            content = file.read()
+            digest.update(content)
+            productions, start_symbol = read_json(json.loads(content.decode("utf-8")), str(path))
+        else:
+            productions, start_symbol = read_bnf(_hashed_lines(file, digest), str(path))
+    return productions, start_symbol, digest.hexdigest()
+
+
+class LoadedGrammar:
+    """
+    A grammar read from a file. Converted artefacts (CNF, analysis sets,
+    minimal DFA) are stored under cache_dir/<content hash>, so an unchanged
+    grammar loads them from disk instead of converting again.
+    """
+
+    def __init__(self, path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+        self.path = path
+        self.productions, self.start_symbol, self.digest = read_grammar(path)
+        self.cache_path = Path(cache_dir) / self.digest if use_cache else None
+        self.cache_hits = 0
+        self._artefacts = {}
+
+    def _cached(self, filename, build, save, load):
+        if filename in self._artefacts:
+            return self._artefacts[filename]
+        target = self.cache_path / filename if self.cache_path is not None else None
+        if target is not None and target.exists():
+            value = load(target)
+            self.cache_hits += 1
+        else:
+            value = build()
+            if target is not None:
+                self.cache_path.mkdir(parents=True, exist_ok=True)
+                partial = target.with_name(target.name + ".tmp")
+                save(value, partial)
+                os.replace(partial, target)  # Readers never see a half-written file
+        self._artefacts[filename] = value
+        return value
+
+    def cnf(self):
+        """The grammar in Chomsky Normal Form ({A: [(B, C), (a,)]})."""
+        def build():
+            return CFGtoCNFConverter(self.productions, self.start_symbol, verbose=False).convert()
+
+        def load(path):
+            with open(path, encoding="utf-8") as file:
+                return {head: [tuple(body) for body in bodies] for head, bodies in json.load(file).items()}
+
+        return self._cached("cnf.json", build, _save_json, load)
+
+    def analysis_sets(self):
+        """nullable, productive, reachable, first and follow of the grammar, as sets."""
+        def build():
+            analysis = grammar_analysis(self.productions, self.start_symbol)
+            return {
+                "nullable": set(analysis.nullable),
+                "productive": set(analysis.productive),
+                "reachable": set(analysis.reachable),
+                "first": {head: set(symbols) for head, symbols in analysis.first.items()},
+                "follow": {head: set(symbols) for head, symbols in analysis.follow.items()},
+            }
+
+        def save(sets, path):
+            _save_json({
+                name: sorted(value) if isinstance(value, set) else
+                {head: sorted(symbols) for head, symbols in value.items()}
+                for name, value in sets.items()
+            }, path)
+
+        def load(path):
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            return {
+                name: set(value) if isinstance(value, list) else
+                {head: set(symbols) for head, symbols in value.items()}
+                for name, value in data.items()
+            }
+
+        return self._cached("analysis.json", build, save, load)
+
+    def extended_grammar(self):
+        """The grammar as an ExtendedGrammar (multi-character symbols kept)."""
+        return ExtendedGrammar.from_compact(CompactGrammar.from_productions(self.productions), self.start_symbol)
+
+    def automaton(self):
+        """
+        Minimal DFA of a right-linear grammar, over its terminals as symbols
+        (match a list of them); ValueError for other grammars.
+        """
+        def build():
+            try:
+                fa = self.extended_grammar().toFiniteAutomaton()
+            except ValueError as error:
+                raise ValueError(f"{self.path}: not a regular grammar ({error})") from None
+            return fa.minimize()
+
+        def load(path):
+            return FiniteAutomaton.from_compiled(FiniteAutomaton.load_compiled(str(path)))
+
+        return self._cached("automaton.lfa", build, lambda fa, path: fa.save_compiled(str(path)), load)
+
+
+def _save_json(value, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(value, file, ensure_ascii=False)
+
+
+def load_grammar(path, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+    """Reads a BNF or JSON grammar file (see read_bnf, read_json) into a LoadedGrammar."""
+    return LoadedGrammar(path, cache_dir=cache_dir, use_cache=use_cache)
@@ -0,0 +1,87 @@
+"""
+Tests of the cached artefacts of grammar_loader on grammars with
+multi-character symbols.
+
+Run from the repository root:
+    python -m pytest lab5
+"""
+import itertools
+import os
+import tempfile
+import unittest
+
+from lab5.grammar_loader import load_grammar
+
+RIGHT_LINEAR = """
+# Names longer than one character; "a b Start" and "ab" must stay apart
+Start -> a b Start | ab | x Rest
+Rest  -> y y Start | y | ε
+"""
+
+
+def derivable(productions, start_symbol, max_length):
+    """Every terminal sequence of at most max_length symbols, by leftmost derivation."""
+    bodies = {head: [tuple(symbol for symbol in body if symbol != "ε") for body in rules]
+              for head, rules in productions.items()}
+    found = set()
+    seen = set()
+    stack = [(start_symbol,)]
+    while stack:
+        form = stack.pop()
+        if form in seen or sum(1 for symbol in form if symbol not in bodies) > max_length:
+            continue
+        seen.add(form)
+        for i, symbol in enumerate(form):
+            if symbol in bodies:
+                for body in bodies[symbol]:
+                    stack.append(form[:i] + body + form[i + 1:])
+                break
+        else:
+            found.add(form)
+    return found
+
+
+class LoadedAutomatonTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text):
+        path = os.path.join(self.directory.name, "grammar.bnf")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def test_cached_dfa_matches_grammar(self):
+        path = self.write(RIGHT_LINEAR)
+        load_grammar(path, cache_dir=self.cache_dir).automaton()
+        loaded = load_grammar(path, cache_dir=self.cache_dir)
+        dfa = loaded.automaton()
+        self.assertEqual(loaded.cache_hits, 1)  # Read back from the cache
+
+        language = derivable(loaded.productions, loaded.start_symbol, 6)
+        terminals = ["a", "b", "ab", "x", "y"]
+        for length in range(7):
+            for word in itertools.product(terminals, repeat=length):
+                with self.subTest(word=word):
+                    self.assertEqual(dfa.stringBelongToLanguage(word), word in language)
+
+    def test_right_linear_counterexamples(self):
+        path = self.write("S -> a A\nA -> b | b S\n")
+        dfa = load_grammar(path, cache_dir=self.cache_dir).automaton()
+        for word in ["ab", "abab", "ababab"]:
+            self.assertTrue(dfa.stringBelongToLanguage(word))
+        for word in ["", "a", "abb", "abbb", "aab"]:
+            self.assertFalse(dfa.stringBelongToLanguage(word))
+
+    def test_not_regular(self):
+        path = self.write("Expr -> ( Expr ) | id\n")
+        with self.assertRaises(ValueError):
+            load_grammar(path, cache_dir=self.cache_dir).automaton()
+
+
+if __name__ == "__main__":
+    unittest.main()